@@ -0,0 +1,8 @@
+"""
+python -m testAgent 入口
+"""
+import sys
+
+from testAgent.cli import main
+
+sys.exit(main())
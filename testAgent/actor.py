@@ -1,11 +1,305 @@
 """
 Actor - 执行器，使用 Playwright 执行计划步骤
 """
+import os
+import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from playwright.sync_api import Page, BrowserContext, TimeoutError as PlaywrightTimeoutError
-from testAgent.config import SCREENSHOTS_DIR, TEST_CONFIG
+from playwright.sync_api import Page, BrowserContext, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from testAgent.config import TEST_CONFIG, SELECTOR_CACHE_CONFIG
+from testAgent.selector_cache import SelectorCache, split_alternatives
+from testAgent.screenshot_service import get_screenshot_service, screenshot_hash
+from testAgent.tracing import FailureTracer
+from testAgent.step_timing import PhaseTimer
+from testAgent.web_metrics import (
+    BudgetExceededError,
+    collect_metrics,
+    enforce_budgets,
+    install_observers,
+    settle_metrics,
+)
+from testAgent.api_actions import (
+    API_ACTIONS,
+    MUTATING_API_ACTIONS,
+    ApiAssertionError,
+    ApiOfflineError,
+    bind_variables,
+    capture_values,
+    check_response,
+    parse_body,
+    request_options,
+    resolve_url,
+)
+
+LOAD_STATES = ("commit", "domcontentloaded", "load", "networkidle")
+ACTIONS = (
+    "goto", "click", "fill", "upload", "wait_for_text", "wait_for_selector", "screenshot",
+) + API_ACTIONS
+SELECTOR_PREFIX = "selector:"
+
+# networkidle 判定为 500ms 内无网络请求，用资源加载结束时间估算其触发时刻；
+# 同时返回 timeOrigin，用于确认仍是 goto 时的同一个文档
+_NETWORKIDLE_ESTIMATE_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    const ends = performance.getEntriesByType('resource').map(r => r.responseEnd);
+    ends.push(nav ? nav.loadEventEnd : 0);
+    return [performance.timeOrigin, Math.max(...ends) + 500];
+}"""
+_READY_AT_JS = "() => [performance.timeOrigin, performance.now()]"
+
+
+# 合并执行连续输入步骤：一次 evaluate 完成多个 fill。
+# 每个操作按候选顺序用 querySelector 查找可见元素，找不到即停止并返回已完成数量，
+# 剩余步骤回落到逐步执行。
+_FUSED_INPUT_JS = """(ops) => {
+    const matched = [];
+    for (const op of ops) {
+        let el = null;
+        let index = -1;
+        for (let i = 0; i < op.alternatives.length && !el; i++) {
+            let candidate = null;
+            try { candidate = document.querySelector(op.alternatives[i]); } catch (e) { continue; }
+            if (candidate && candidate.getClientRects().length && !candidate.disabled) {
+                el = candidate;
+                index = i;
+            }
+        }
+        if (!el) break;
+        const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+            : el instanceof HTMLInputElement ? HTMLInputElement.prototype : null;
+        if (!proto) break;
+        el.focus();
+        Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, op.value);
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        matched.push(index);
+    }
+    return matched;
+}"""
+
+FUSIBLE_ACTIONS = ("fill",)
+# 可能离开当前文档的动作，执行前先结算上一次 goto 的等待节省
+NAVIGATING_ACTIONS = ("goto", "click")
+
+
+def compile_plan(steps: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    计划编译：将连续的 fill 合并为一个执行单元。
+    click 需要命中检测、遮挡与可用性检查，始终通过 page.click 逐步执行；
+    显式声明 depends_on 的步骤不并入前面的单元，保持其依赖语义。
+    """
+    units: List[List[Dict[str, Any]]] = []
+    run: List[Dict[str, Any]] = []
+
+    def flush():
+        if len(run) > 1:
+            units.append(list(run))
+        else:
+            units.extend([s] for s in run)
+        run.clear()
+
+    for step in steps:
+        if step.get("action") not in FUSIBLE_ACTIONS:
+            flush()
+            units.append([step])
+            continue
+        if run and step.get("depends_on") is not None:
+            flush()
+        run.append(step)
+    flush()
+    return units
+
+
+# 元素在操作过程中被重新渲染时 Playwright 报告的错误片段
+_DETACHED_MARKERS = ("not attached to the DOM", "detached")
+
+
+def is_retryable(exc: Exception, action: str = "") -> bool:
+    """超时与元素脱离 DOM 属于瞬时错误，可以重试；非幂等的 API 动作不重试，以免重复提交"""
+    if action in MUTATING_API_ACTIONS:
+        return False
+    if isinstance(exc, PlaywrightTimeoutError):
+        return True
+    return isinstance(exc, PlaywrightError) and any(m in str(exc) for m in _DETACHED_MARKERS)
+
+
+def find_blocker(
+    step: Dict[str, Any], previous_id: Any, statuses: Dict[Any, str]
+) -> Optional[Any]:
+    """返回导致该步骤无法执行的前置步骤 id；前置步骤都成功时返回 None"""
+    depends_on = step.get("depends_on")
+    if depends_on is None:
+        depends_on = [] if previous_id is None else [previous_id]
+    for dep in depends_on:
+        if statuses.get(dep) in ("failed", "blocked"):
+            return dep
+    return None
+
+
+def retry_delay(attempt: int) -> float:
+    """第 attempt 次失败后的退避时间（秒），指数增长"""
+    return TEST_CONFIG["retry_backoff"] * TEST_CONFIG["retry_backoff_factor"] ** (attempt - 1)
+
+
+def should_retry(exc: Exception, action: str, attempts: int, retry_budget: int) -> bool:
+    """仅对可重试错误、且未超过单步次数与计划预算时重试"""
+    return is_retryable(exc, action) and attempts <= TEST_CONFIG["retry_count"] and retry_budget > 0
+
+
+def failure_message(exc: Exception, action: str, target: str) -> str:
+    """步骤失败时展示的消息：超时只给出动作与目标，预算、断言等业务错误直接使用其描述"""
+    if isinstance(exc, PlaywrightTimeoutError):
+        return f"超时: {action} -> {target}"
+    if isinstance(exc, (BudgetExceededError, ApiAssertionError, ApiOfflineError)):
+        return str(exc)
+    return f"异常: {exc}"
+
+
+def build_result(
+    step: Dict[str, Any], status: str, message: str, screenshot_path: str, duration: float
+) -> Dict[str, Any]:
+    """组装单步结果，同步/异步执行器共用同一结构"""
+    return {
+        "id": step.get("id"),
+        "name": step.get("note") or step.get("action"),
+        "action": step.get("action"),
+        "target": step.get("target", ""),
+        "expected": step.get("expect", ""),
+        "value": step.get("value", ""),
+        "status": status,
+        "message": message,
+        "screenshot": screenshot_path,
+        "screenshot_hash": screenshot_hash(screenshot_path),
+        "duration": duration,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+def step_result(
+    step: Dict[str, Any],
+    status: str,
+    message: str,
+    screenshot_path: str,
+    duration: float,
+    attempts: int,
+    retry_time: float,
+    metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    已执行步骤的完整结果：retry_time 为最后一次尝试之前的失败尝试与退避等待；
+    goto 另外记录就绪策略、性能指标与预算，wait_saved 在离开页面时结算
+    """
+    result = build_result(step, status, message, screenshot_path, duration)
+    result["attempts"] = attempts
+    result["retry_time"] = round(retry_time, 3)
+    if step.get("action") == "goto":
+        result["wait_until"] = step.get("wait_until") or TEST_CONFIG["default_wait_until"]
+        result["wait_saved"] = 0.0
+        result["metrics"] = metrics
+        result["budgets"] = step.get("budgets") or {}
+    return result
+
+
+def blocked_result(step: Dict[str, Any], blocker: Any) -> Dict[str, Any]:
+    result = build_result(step, "blocked", f"前置步骤 {blocker} 未通过，已跳过", "", 0.0)
+    result["attempts"] = 0
+    result["retry_time"] = 0.0
+    return result
+
+
+def wait_saved(ready: Tuple[float, float], idle: Tuple[float, float]) -> Optional[float]:
+    """
+    由 goto 就绪时的 (timeOrigin, now) 与离开前估算的 (timeOrigin, networkidle 时刻) 计算节省秒数；
+    timeOrigin 不同说明期间已经导航到其他文档，无法比较，返回 None
+    """
+    (origin, ready_at), (current_origin, idle_at) = ready, idle
+    if origin != current_origin:
+        return None
+    return round(max(0.0, idle_at - ready_at) / 1000, 3)
+
+
+def prefer_cached(alternatives: List[str], cached: Optional[str]) -> List[str]:
+    """缓存的候选排在最前，其余保持原顺序"""
+    if cached not in alternatives:
+        return list(alternatives)
+    return [cached] + [a for a in alternatives if a != cached]
+
+
+def union_locator(page, alternatives: List[str]):
+    """任一候选匹配即可的 locator；同步与异步 API 的 locator 构造都不访问浏览器"""
+    union = page.locator(alternatives[0])
+    for alternative in alternatives[1:]:
+        union = union.or_(page.locator(alternative))
+    return union
+
+
+def record_selector(
+    cache: SelectorCache,
+    stats: Dict[str, int],
+    url: str,
+    target: str,
+    cached: Optional[str],
+    chosen: str,
+    hit: bool,
+):
+    """
+    记录一次候选解析：hit 表示缓存的候选在 hit_wait 内出现。
+    未命中时，只有页面已渲染出其他候选、而缓存的候选不匹配才淘汰缓存
+    """
+    stats["hits" if hit else "misses"] += 1
+    if not hit and cached and chosen != cached:
+        cache.evict(url, target)
+        stats["evictions"] += 1
+    cache.record(url, target, chosen)
+
+
+def prepare_api(step: Dict[str, Any], offline: bool) -> Tuple[str, Dict[str, Any]]:
+    """API 步骤的请求地址与 fetch 参数；HAR 回放模式下直接失败"""
+    url = resolve_url(step.get("target", ""))
+    if offline:
+        raise ApiOfflineError(url)
+    return url, request_options(step.get("action"), resolve_value(step.get("value", "")))
+
+
+def finish_api(
+    step: Dict[str, Any], url: str, method: str, status: int, text: str, variables: Dict[str, Any]
+) -> str:
+    """校验 API 响应、把捕获的值写入 variables，返回步骤消息；断言不通过时抛出 ApiAssertionError"""
+    body = parse_body(text)
+    check_response(status, body, step.get("assertions"))
+    captured = capture_values(body, step.get("capture"))
+    variables.update(captured)
+    message = f"{method} {url} -> {status}"
+    if captured:
+        message += "，捕获 " + "、".join(captured)
+    return message
+
+
+def resolve_value(value: str) -> str:
+    """解析占位符，如 {{TEST_USERNAME}}，从环境变量读取"""
+    if value.startswith("{{") and value.endswith("}}"):
+        return os.getenv(value.strip("{} "), "")
+    return value
+
+
+def parse_wait_until(wait_until: str) -> Tuple[str, str]:
+    """将就绪策略拆分为 (load_state, selector)，selector 策略以 commit 发起导航"""
+    wait_until = wait_until or TEST_CONFIG["default_wait_until"]
+    if wait_until.startswith(SELECTOR_PREFIX):
+        return "commit", wait_until[len(SELECTOR_PREFIX):].strip()
+    if wait_until not in LOAD_STATES:
+        raise ValueError(f"未知的就绪策略: {wait_until}")
+    return wait_until, ""
+
+
+def navigate(page: Page, url: str, wait_until: str = ""):
+    """按就绪策略导航：页面生命周期事件，或某个选择器可见"""
+    load_state, selector = parse_wait_until(wait_until)
+    page.goto(url, wait_until=load_state)
+    if selector:
+        page.locator(selector).first.wait_for(state="visible", timeout=TEST_CONFIG["wait_timeout"])
 
 
 class Actor:
@@ -16,108 +310,320 @@ class Actor:
     - 返回每步的状态、消息、截图
     """
 
-    def __init__(self, page: Page, context: BrowserContext):
+    def __init__(
+        self,
+        page: Page,
+        context: BrowserContext,
+        selector_cache: Optional[SelectorCache] = None,
+        tracer: Optional[FailureTracer] = None,
+        offline: bool = False,
+    ):
         self.page = page
         self.context = context
+        # HAR 回放模式：API 步骤不经过 HAR 路由，直接判为失败而不访问网络
+        self.offline = offline
+        self.selector_cache = selector_cache
+        self.tracer = tracer
+        self.timer: Optional[PhaseTimer] = PhaseTimer() if TEST_CONFIG["phase_timing"] else None
+        self.selector_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        # 最近一次 goto 的结果及其就绪时刻 (timeOrigin, performance.now())，离开页面前结算节省时间
+        self._pending_nav: Optional[Tuple[Dict[str, Any], Tuple[float, float]]] = None
+        self._ready_at: Optional[Tuple[float, float]] = None
+        self._metrics: Optional[Dict[str, Any]] = None
+        # 声明了预算的 goto 需要在导航前注入性能观察器；重复注入由脚本自身忽略
+        self._observing = False
+        # API 步骤捕获的变量，后续步骤通过 {{name}} 引用
+        self.variables: Dict[str, Any] = {}
+        # 当前计划剩余的重试次数；共享前缀分叉时由调用方把剩余值交给新的 Actor
+        self.retry_budget = TEST_CONFIG["retry_budget"]
 
-    def execute_plan(self, steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def execute_plan(
+        self, steps: List[Dict[str, Any]], prior: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        执行步骤并返回每步结果。
+        prior 为同一计划中已执行步骤的结果（如共享前缀），用于延续依赖判断；
+        有 prior 时视为同一计划的后续片段，沿用剩余的重试预算，否则重置预算
+        """
         results: List[Dict[str, Any]] = []
-        for step in steps:
-            result = self._execute_step(step)
-            results.append(result)
-            if result["status"] == "failed":
-                # 失败则根据配置决定是否继续，这里简单地继续执行剩余步骤
-                continue
+        if not prior:
+            self.retry_budget = TEST_CONFIG["retry_budget"]
+        statuses: Dict[Any, str] = {r.get("id"): r["status"] for r in prior or []}
+        previous_id = prior[-1].get("id") if prior else None
+        units = compile_plan(steps) if TEST_CONFIG["fuse_steps"] else [[s] for s in steps]
+        for unit in units:
+            fused_results: List[Dict[str, Any]] = []
+            if len(unit) > 1 and not (
+                TEST_CONFIG["fail_fast"] and find_blocker(unit[0], previous_id, statuses) is not None
+            ):
+                fused_results = self._execute_fused(unit)
+            for step in unit:
+                if fused_results:
+                    result = fused_results.pop(0)
+                else:
+                    blocker = find_blocker(step, previous_id, statuses) if TEST_CONFIG["fail_fast"] else None
+                    if blocker is not None:
+                        # 前置步骤失败：不等待超时、不截图，直接标记
+                        result = blocked_result(step, blocker)
+                    else:
+                        if step.get("action") in NAVIGATING_ACTIONS:
+                            self._settle_wait_savings()
+                        result = self._execute_step(step)
+                if self.tracer:
+                    trace_paths = self.tracer.step_finished(result)
+                    if trace_paths:
+                        result["trace"] = trace_paths[-1]
+                        result["trace_before"] = trace_paths[0] if len(trace_paths) > 1 else ""
+                results.append(result)
+                statuses[step.get("id")] = result["status"]
+                previous_id = step.get("id")
+        self._settle_wait_savings()
+        if self.selector_cache:
+            self.selector_cache.save()
         return results
 
     def _execute_step(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        step = bind_variables(step, self.variables)
         action = step.get("action")
         target = step.get("target", "")
-        value = step.get("value", "")
-        expect = step.get("expect", "")
 
-        start = datetime.now()
-        status = "passed"
-        message = ""
+        if self.timer:
+            self.timer.begin_step(step)
+        start = time.monotonic()
+        attempts = 0
+        while True:
+            attempts += 1
+            attempt_start = time.monotonic()
+            self._ready_at = None
+            self._metrics = None
+            try:
+                status, message, screenshot_path = self._perform_action(step)
+                break
+            except Exception as exc:
+                status = "failed"
+                message = failure_message(exc, action, target)
+                screenshot_path = ""
+                if not should_retry(exc, action, attempts, self.retry_budget):
+                    break
+                self.retry_budget -= 1
+                with self._phase("backoff"):
+                    time.sleep(retry_delay(attempts))
+
+        end = time.monotonic()
+        duration = end - start
+
+        if status == "failed" and TEST_CONFIG["screenshot_on_failure"]:
+            with self._phase("screenshot"):
+                screenshot_path = screenshot_path or self._screenshot(f"error_step_{step.get('id', 'x')}")
+
+        with self._phase("result"):
+            result = step_result(
+                step, status, message, screenshot_path, duration, attempts, attempt_start - start, self._metrics
+            )
+            if action == "goto" and status == "passed" and self._ready_at is not None:
+                self._pending_nav = (result, self._ready_at)
+        if self.timer:
+            self.timer.end_step(status)
+        return result
+
+    def _phase(self, name: str):
+        """阶段计时；未开启 phase_timing 时不产生任何开销"""
+        return self.timer.phase(name) if self.timer else nullcontext()
+
+    def _auto_wait(self, selector: str, state: str = "visible"):
+        """
+        开启阶段计时时，先单独等待元素就绪，使自动等待与动作本身分开计时；
+        未开启时交给 Playwright 动作内置的自动等待，不增加往返。
+        """
+        if self.timer:
+            with self._phase("auto_wait"):
+                self.page.locator(selector).first.wait_for(state=state, timeout=TEST_CONFIG["wait_timeout"])
+
+    def _perform_action(self, step: Dict[str, Any]) -> Tuple[str, str, str]:
+        """执行一次动作，返回 (status, message, screenshot_path)；失败时抛出异常"""
+        action = step.get("action")
+        target = step.get("target", "")
+        value = step.get("value", "")
         screenshot_path = ""
 
-        try:
-            if action == "goto":
-                self.page.goto(target, wait_until="networkidle")
-                message = "页面导航成功"
-
-            elif action == "click":
-                self.page.click(target, timeout=TEST_CONFIG["wait_timeout"])
-                message = f"点击 {target} 成功"
-
-            elif action == "fill":
-                # value 中如果包含占位变量，从环境变量读取
-                resolved = self._resolve_value(value)
-                self.page.fill(target, resolved, timeout=TEST_CONFIG["wait_timeout"])
-                message = "输入完成"
-
-            elif action == "upload":
-                resolved_path = Path(value)
-                if not resolved_path.exists():
-                    raise FileNotFoundError(f"未找到上传文件: {resolved_path}")
-                input_handle = self.page.locator(target).first
-                input_handle.set_input_files(str(resolved_path))
-                message = f"上传 {resolved_path.name} 成功"
-
-            elif action == "wait_for_text":
+        if action == "goto":
+            wait_until = step.get("wait_until") or TEST_CONFIG["default_wait_until"]
+            budgets = step.get("budgets")
+            if budgets and not self._observing:
+                install_observers(self.context)
+                self._observing = True
+            with self._phase("navigation"):
+                navigate(self.page, target, wait_until)
+            if TEST_CONFIG["report_wait_savings"] and wait_until != "networkidle":
+                self._ready_at = tuple(self.page.evaluate(_READY_AT_JS))
+            if budgets:
+                # 就绪策略通常早于 load 与 LCP，判定预算前等待指标稳定
+                with self._phase("navigation"):
+                    settle_metrics(self.page)
+            if TEST_CONFIG["collect_web_metrics"] or budgets:
+                self._metrics = collect_metrics(self.page)
+                enforce_budgets(self._metrics, budgets)
+            return "passed", "页面导航成功", screenshot_path
+
+        elif action == "click":
+            with self._phase("selector"):
+                selector = self._resolve_target(target)
+            self._auto_wait(selector)
+            with self._phase("action"):
+                self.page.click(selector, timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", f"点击 {target} 成功", screenshot_path
+
+        elif action == "fill":
+            # value 中如果包含占位变量，从环境变量读取
+            resolved = resolve_value(value)
+            with self._phase("selector"):
+                selector = self._resolve_target(target)
+            self._auto_wait(selector)
+            with self._phase("action"):
+                self.page.fill(selector, resolved, timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", "输入完成", screenshot_path
+
+        elif action == "upload":
+            resolved_path = Path(value)
+            if not resolved_path.exists():
+                raise FileNotFoundError(f"未找到上传文件: {resolved_path}")
+            with self._phase("selector"):
+                selector = self._resolve_target(target)
+            # 文件输入框通常是隐藏的，只等待其挂载
+            self._auto_wait(selector, state="attached")
+            with self._phase("action"):
+                self.page.locator(selector).first.set_input_files(str(resolved_path))
+            return "passed", f"上传 {resolved_path.name} 成功", screenshot_path
+
+        elif action == "wait_for_text":
+            with self._phase("auto_wait"):
                 self.page.get_by_text(target).wait_for(timeout=TEST_CONFIG["wait_timeout"])
-                message = f"找到文本: {target}"
+            return "passed", f"找到文本: {target}", screenshot_path
 
-            elif action == "wait_for_selector":
-                self.page.locator(target).first.wait_for(timeout=TEST_CONFIG["wait_timeout"])
-                message = f"找到元素: {target}"
+        elif action == "wait_for_selector":
+            with self._phase("selector"):
+                selector = self._resolve_target(target)
+            with self._phase("auto_wait"):
+                self.page.locator(selector).first.wait_for(timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", f"找到元素: {target}", screenshot_path
 
-            elif action == "screenshot":
-                screenshot_path = self._screenshot(step.get("target", "step"))
-                message = f"截图已保存: {screenshot_path}"
+        elif action == "screenshot":
+            # value 可指定元素选择器，只截取该元素
+            with self._phase("screenshot"):
+                screenshot_path = self._screenshot(step.get("target", "step"), value)
+            return "passed", f"截图已保存: {screenshot_path}", screenshot_path
 
-            else:
-                status = "skipped"
-                message = f"未知动作: {action}"
+        elif action in API_ACTIONS:
+            return self._perform_api(step)
 
-        except PlaywrightTimeoutError:
-            status = "failed"
-            message = f"超时: {action} -> {target}"
-        except Exception as exc:
-            status = "failed"
-            message = f"异常: {exc}"
+        return "skipped", f"未知动作: {action}", screenshot_path
 
-        end = datetime.now()
-        duration = (end - start).total_seconds()
+    def _perform_api(self, step: Dict[str, Any]) -> Tuple[str, str, str]:
+        """
+        通过 context.request 执行 API 步骤。
+        APIRequestContext 随上下文复用连接并共享 Cookie，无需为每个请求新建客户端。
+        """
+        url, options = prepare_api(step, self.offline)
+        with self._phase("action"):
+            response = self.context.request.fetch(
+                url, timeout=TEST_CONFIG["wait_timeout"], fail_on_status_code=False, **options
+            )
+            text = response.text()
+        with self._phase("result"):
+            message = finish_api(step, url, options["method"], response.status, text, self.variables)
+        return "passed", message, ""
 
-        if status == "failed" and TEST_CONFIG["screenshot_on_failure"]:
-            screenshot_path = screenshot_path or self._screenshot(f"error_step_{step.get('id', 'x')}")
-
-        return {
-            "id": step.get("id"),
-            "name": step.get("note") or step.get("action"),
-            "action": action,
-            "target": target,
-            "expected": expect,
-            "value": value,
-            "status": status,
-            "message": message,
-            "screenshot": screenshot_path,
-            "duration": duration,
-            "timestamp": datetime.now().isoformat(),
-        }
+    def _execute_fused(self, unit: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        合并执行一个单元：等待首个目标可见后，用一次 evaluate 完成全部输入。
+        返回已在批量中完成的前缀步骤的结果；未完成的步骤由调用方逐步执行。
+        """
+        start = time.monotonic()
+        # 与逐步执行一致，先替换前序步骤捕获的变量
+        unit = [bind_variables(step, self.variables) for step in unit]
+        ops = []
+        for step in unit:
+            cached = self.selector_cache.get(self.page.url, step.get("target", "")) if self.selector_cache else None
+            ops.append({
+                "alternatives": prefer_cached(split_alternatives(step.get("target", "")), cached),
+                "value": resolve_value(step.get("value", "")),
+            })
+
+        if self.timer:
+            ids = "+".join(str(step.get("id")) for step in unit)
+            self.timer.begin_step({"id": ids, "action": "fused"})
+        try:
+            first = union_locator(self.page, ops[0]["alternatives"])
+            with self._phase("auto_wait"):
+                first.first.wait_for(state="visible", timeout=TEST_CONFIG["wait_timeout"])
+            with self._phase("action"):
+                matched = self.page.evaluate(_FUSED_INPUT_JS, ops)
+        except Exception:
+            # 批量路径失败不影响正确性，全部交给逐步执行（含重试与失败截图）
+            matched = []
+        finally:
+            if self.timer:
+                self.timer.end_step()
+        if not matched:
+            return []
+
+        duration = (time.monotonic() - start) / max(len(matched), 1)
+        results: List[Dict[str, Any]] = []
+        for step, op, index in zip(unit, ops, matched):
+            if self.selector_cache and len(op["alternatives"]) > 1:
+                self.selector_cache.record(self.page.url, step.get("target", ""), op["alternatives"][index])
+            result = step_result(step, "passed", "输入完成（合并执行）", "", duration, 1, 0.0)
+            result["fused"] = len(matched)
+            results.append(result)
+        return results
+
+    def _resolve_target(self, target: str) -> str:
+        """
+        将多候选 target 解析为单个选择器。
+        命中缓存时先在 hit_wait 内等待缓存的候选挂载（页面可能尚未渲染完）；
+        未命中或超时后等待任一候选出现，再按顺序（缓存的候选优先）确认实际匹配的候选。
+        只有其他候选命中而缓存的候选不匹配时才淘汰缓存。
+        """
+        alternatives = split_alternatives(target)
+        if self.selector_cache is None or len(alternatives) < 2:
+            return target
 
-    def _resolve_value(self, value: str) -> str:
-        """解析占位符，如 {{TEST_USERNAME}}"""
-        import os
+        url = self.page.url
+        cached = self.selector_cache.get(url, target)
+        if cached in alternatives:
+            try:
+                self.page.locator(cached).first.wait_for(
+                    state="attached", timeout=SELECTOR_CACHE_CONFIG["hit_wait"]
+                )
+                record_selector(self.selector_cache, self.selector_stats, url, target, cached, cached, hit=True)
+                return cached
+            except PlaywrightTimeoutError:
+                pass
 
-        if value.startswith("{{") and value.endswith("}}"):
-            env_key = value.strip("{} ")
-            return os.getenv(env_key, "")
-        return value
+        alternatives = prefer_cached(alternatives, cached)
+        union_locator(self.page, alternatives).first.wait_for(state="attached", timeout=TEST_CONFIG["wait_timeout"])
+        for alternative in alternatives:
+            if self.page.locator(alternative).count() > 0:
+                record_selector(self.selector_cache, self.selector_stats, url, target, cached, alternative, hit=False)
+                return alternative
+        return target
+
+    def _settle_wait_savings(self):
+        """
+        在离开页面前估算上一次 goto 相比 networkidle 节省的时间。
+        只读取 Performance API，不会额外等待网络空闲；
+        期间已经导航到其他文档（timeOrigin 不同）时无法比较，放弃估算。
+        """
+        if not self._pending_nav:
+            return
+        result, ready = self._pending_nav
+        self._pending_nav = None
+        try:
+            saved = wait_saved(ready, tuple(self.page.evaluate(_NETWORKIDLE_ESTIMATE_JS)))
+        except Exception:
+            return
+        if saved is not None:
+            result["wait_saved"] = saved
 
-    def _screenshot(self, name: str) -> str:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = SCREENSHOTS_DIR / f"{name}_{timestamp}.png"
-        self.page.screenshot(path=str(filepath))
-        return str(filepath)
+    def _screenshot(self, name: str, selector: str = "") -> str:
+        return get_screenshot_service().capture(self.page, name, selector)
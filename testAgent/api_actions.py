@@ -0,0 +1,139 @@
+"""
+API 级动作：通过 BrowserContext.request 直接发起 HTTP 请求，
+与页面共享 Cookie，用于替代只为准备数据而存在的 UI 步骤
+"""
+import json
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urljoin
+from testAgent.config import BASE_URL
+
+API_ACTIONS = ("api_get", "api_post", "api_upload")
+# 非幂等的 API 动作：超时后请求可能已被服务端处理，重试会重复提交
+MUTATING_API_ACTIONS = ("api_post", "api_upload")
+
+# 上传时 multipart 使用的默认字段名
+UPLOAD_FIELD = "file"
+
+_VARIABLE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# 与 assertions 中任意值匹配，只要求字段存在
+ANY_VALUE = "*"
+
+
+class ApiAssertionError(Exception):
+    """API 响应不满足断言"""
+
+
+class ApiOfflineError(Exception):
+    """HAR 回放模式下执行 API 步骤：context.request 不经过 HAR 路由，也不会被录制"""
+
+    def __init__(self, url: str):
+        super().__init__(f"HAR 回放模式下无法离线执行 API 请求: {url}")
+
+
+def resolve_url(target: str) -> str:
+    """相对路径以 BASE_URL 为基准"""
+    return urljoin(BASE_URL.rstrip("/") + "/", target)
+
+
+def bind_variables(step: Dict[str, Any], variables: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将 target / value 中的 {{name}} 替换为之前步骤捕获的变量。
+    未捕获的名称保持原样，留给 actor.resolve_value 按环境变量解析。
+    """
+    if not variables:
+        return step
+
+    def substitute(text: str) -> str:
+        return _VARIABLE.sub(
+            lambda m: str(variables[m.group(1)]) if m.group(1) in variables else m.group(0), text
+        )
+
+    bound = dict(step)
+    for key in ("target", "value"):
+        if isinstance(bound.get(key), str):
+            bound[key] = substitute(bound[key])
+    return bound
+
+
+def json_path(data: Any, path: str) -> Any:
+    """按点号路径取值，如 data.items.0.id；路径不存在时抛出 KeyError"""
+    current = data
+    for part in path.split(".") if path else []:
+        if isinstance(current, list) and part.lstrip("-").isdigit():
+            current = current[int(part)]
+        elif isinstance(current, dict) and part in current:
+            current = current[part]
+        else:
+            raise KeyError(path)
+    return current
+
+
+def request_options(action: str, value: str) -> Dict[str, Any]:
+    """根据动作类型组装 fetch 的请求参数"""
+    if action == "api_get":
+        return {"method": "GET"}
+    if action == "api_upload":
+        path = Path(value)
+        if not path.exists():
+            raise FileNotFoundError(f"未找到上传文件: {path}")
+        mime_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        return {
+            "method": "POST",
+            "multipart": {
+                UPLOAD_FIELD: {"name": path.name, "mimeType": mime_type, "buffer": path.read_bytes()},
+            },
+        }
+    # api_post：value 为 JSON 时以 JSON 发送，否则作为原始请求体
+    try:
+        data: Any = json.loads(value) if value else None
+    except ValueError:
+        data = value
+    return {"method": "POST", "data": data}
+
+
+def check_response(
+    status: int, body: Optional[Any], assertions: Optional[Dict[str, Any]]
+) -> None:
+    """
+    校验响应。assertions 中 "status" 为期望状态码（或状态码列表），
+    其余键为 JSON 路径，值为期望值，"*" 表示只要求存在。
+    未声明 status 时要求 2xx。
+    """
+    assertions = dict(assertions or {})
+    expected_status = assertions.pop("status", None)
+    if expected_status is None:
+        if not 200 <= status < 300:
+            raise ApiAssertionError(f"响应状态码 {status}，期望 2xx")
+    elif status not in (expected_status if isinstance(expected_status, list) else [expected_status]):
+        raise ApiAssertionError(f"响应状态码 {status}，期望 {expected_status}")
+
+    for path, expected in assertions.items():
+        try:
+            actual = json_path(body, path)
+        except (KeyError, IndexError, TypeError):
+            raise ApiAssertionError(f"响应中缺少字段: {path}")
+        if expected != ANY_VALUE and actual != expected:
+            raise ApiAssertionError(f"字段 {path} 为 {actual!r}，期望 {expected!r}")
+
+
+def capture_values(body: Optional[Any], capture: Optional[Dict[str, str]]) -> Dict[str, Any]:
+    """按 capture（变量名 -> JSON 路径）从响应中提取变量"""
+    captured: Dict[str, Any] = {}
+    for name, path in (capture or {}).items():
+        try:
+            captured[name] = json_path(body, path)
+        except (KeyError, IndexError, TypeError):
+            raise ApiAssertionError(f"无法捕获变量 {name}：响应中缺少字段 {path}")
+    return captured
+
+
+def parse_body(text: str) -> Optional[Any]:
+    """响应体按 JSON 解析，非 JSON 时返回 None"""
+    try:
+        return json.loads(text) if text else None
+    except ValueError:
+        return None
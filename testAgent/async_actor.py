@@ -0,0 +1,253 @@
+"""
+AsyncActor - 基于 playwright.async_api 的异步执行器
+"""
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from playwright.async_api import Page, BrowserContext, TimeoutError as PlaywrightTimeoutError
+from testAgent.actor import (
+    NAVIGATING_ACTIONS,
+    _NETWORKIDLE_ESTIMATE_JS,
+    _READY_AT_JS,
+    blocked_result,
+    failure_message,
+    find_blocker,
+    finish_api,
+    parse_wait_until,
+    prefer_cached,
+    prepare_api,
+    record_selector,
+    resolve_value,
+    retry_delay,
+    should_retry,
+    step_result,
+    union_locator,
+    wait_saved,
+)
+from testAgent.config import TEST_CONFIG, SELECTOR_CACHE_CONFIG
+from testAgent.selector_cache import SelectorCache, split_alternatives
+from testAgent.tracing import AsyncFailureTracer
+from testAgent.screenshot_service import get_screenshot_service
+from testAgent.web_metrics import (
+    collect_metrics_async,
+    enforce_budgets,
+    install_observers_async,
+    settle_metrics_async,
+)
+from testAgent.api_actions import API_ACTIONS, bind_variables
+
+
+class AsyncActor:
+    """
+    AsyncActor（异步执行者）
+    - 与 Actor 的步骤语义完全一致：重试、fail-fast、API 步骤、性能预算、选择器缓存与失败追踪
+    - 结果组装、错误消息、重试判定与候选解析规则都复用 actor 模块的函数，这里只负责异步调用浏览器
+    - 多个计划可以在同一个事件循环中并发执行
+    - 步骤合并与阶段计时只影响执行速度与性能分析，仅在同步 Actor 中提供
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        context: BrowserContext,
+        offline: bool = False,
+        selector_cache: Optional[SelectorCache] = None,
+        tracer: Optional[AsyncFailureTracer] = None,
+    ):
+        self.page = page
+        self.context = context
+        self.offline = offline
+        self.selector_cache = selector_cache
+        self.tracer = tracer
+        self.selector_stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.variables: Dict[str, Any] = {}
+        self.retry_budget = TEST_CONFIG["retry_budget"]
+        self._pending_nav: Optional[Tuple[Dict[str, Any], Tuple[float, float]]] = None
+        self._ready_at: Optional[Tuple[float, float]] = None
+        self._metrics: Optional[Dict[str, Any]] = None
+        self._observing = False
+
+    async def execute_plan(self, steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        self.retry_budget = TEST_CONFIG["retry_budget"]
+        statuses: Dict[Any, str] = {}
+        previous_id = None
+        for step in steps:
+            blocker = find_blocker(step, previous_id, statuses) if TEST_CONFIG["fail_fast"] else None
+            if blocker is not None:
+                result = blocked_result(step, blocker)
+            else:
+                if step.get("action") in NAVIGATING_ACTIONS:
+                    await self._settle_wait_savings()
+                result = await self._execute_step(step)
+            if self.tracer:
+                trace_paths = await self.tracer.step_finished(result)
+                if trace_paths:
+                    result["trace"] = trace_paths[-1]
+                    result["trace_before"] = trace_paths[0] if len(trace_paths) > 1 else ""
+            results.append(result)
+            statuses[step.get("id")] = result["status"]
+            previous_id = step.get("id")
+        await self._settle_wait_savings()
+        if self.selector_cache:
+            self.selector_cache.save()
+        return results
+
+    async def _execute_step(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        step = bind_variables(step, self.variables)
+        action = step.get("action")
+        target = step.get("target", "")
+
+        start = time.monotonic()
+        attempts = 0
+        while True:
+            attempts += 1
+            attempt_start = time.monotonic()
+            self._ready_at = None
+            self._metrics = None
+            try:
+                status, message, screenshot_path = await self._perform_action(step)
+                break
+            except Exception as exc:
+                status = "failed"
+                message = failure_message(exc, action, target)
+                screenshot_path = ""
+                if not should_retry(exc, action, attempts, self.retry_budget):
+                    break
+                self.retry_budget -= 1
+                await asyncio.sleep(retry_delay(attempts))
+
+        duration = time.monotonic() - start
+
+        if status == "failed" and TEST_CONFIG["screenshot_on_failure"]:
+            screenshot_path = screenshot_path or await self._screenshot(f"error_step_{step.get('id', 'x')}")
+
+        result = step_result(
+            step, status, message, screenshot_path, duration, attempts, attempt_start - start, self._metrics
+        )
+        if action == "goto" and status == "passed" and self._ready_at is not None:
+            self._pending_nav = (result, self._ready_at)
+        return result
+
+    async def _perform_action(self, step: Dict[str, Any]) -> Tuple[str, str, str]:
+        """执行一次动作，返回 (status, message, screenshot_path)；失败时抛出异常"""
+        action = step.get("action")
+        target = step.get("target", "")
+        value = step.get("value", "")
+        screenshot_path = ""
+
+        if action == "goto":
+            wait_until = step.get("wait_until") or TEST_CONFIG["default_wait_until"]
+            budgets = step.get("budgets")
+            if budgets and not self._observing:
+                await install_observers_async(self.context)
+                self._observing = True
+            load_state, selector = parse_wait_until(wait_until)
+            await self.page.goto(target, wait_until=load_state)
+            if selector:
+                await self.page.locator(selector).first.wait_for(
+                    state="visible", timeout=TEST_CONFIG["wait_timeout"]
+                )
+            if TEST_CONFIG["report_wait_savings"] and wait_until != "networkidle":
+                self._ready_at = tuple(await self.page.evaluate(_READY_AT_JS))
+            if budgets:
+                await settle_metrics_async(self.page)
+            if TEST_CONFIG["collect_web_metrics"] or budgets:
+                self._metrics = await collect_metrics_async(self.page)
+                enforce_budgets(self._metrics, budgets)
+            return "passed", "页面导航成功", screenshot_path
+
+        elif action == "click":
+            selector = await self._resolve_target(target)
+            await self.page.click(selector, timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", f"点击 {target} 成功", screenshot_path
+
+        elif action == "fill":
+            resolved = resolve_value(value)
+            selector = await self._resolve_target(target)
+            await self.page.fill(selector, resolved, timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", "输入完成", screenshot_path
+
+        elif action == "upload":
+            resolved_path = Path(value)
+            if not resolved_path.exists():
+                raise FileNotFoundError(f"未找到上传文件: {resolved_path}")
+            selector = await self._resolve_target(target)
+            await self.page.locator(selector).first.set_input_files(str(resolved_path))
+            return "passed", f"上传 {resolved_path.name} 成功", screenshot_path
+
+        elif action == "wait_for_text":
+            await self.page.get_by_text(target).wait_for(timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", f"找到文本: {target}", screenshot_path
+
+        elif action == "wait_for_selector":
+            selector = await self._resolve_target(target)
+            await self.page.locator(selector).first.wait_for(timeout=TEST_CONFIG["wait_timeout"])
+            return "passed", f"找到元素: {target}", screenshot_path
+
+        elif action == "screenshot":
+            screenshot_path = await self._screenshot(step.get("target", "step"), value)
+            return "passed", f"截图已保存: {screenshot_path}", screenshot_path
+
+        elif action in API_ACTIONS:
+            return await self._perform_api(step)
+
+        return "skipped", f"未知动作: {action}", screenshot_path
+
+    async def _perform_api(self, step: Dict[str, Any]) -> Tuple[str, str, str]:
+        url, options = prepare_api(step, self.offline)
+        response = await self.context.request.fetch(
+            url, timeout=TEST_CONFIG["wait_timeout"], fail_on_status_code=False, **options
+        )
+        text = await response.text()
+        return "passed", finish_api(step, url, options["method"], response.status, text, self.variables), ""
+
+    async def _resolve_target(self, target: str) -> str:
+        """Actor._resolve_target 的异步版本"""
+        alternatives = split_alternatives(target)
+        if self.selector_cache is None or len(alternatives) < 2:
+            return target
+
+        url = self.page.url
+        cached = self.selector_cache.get(url, target)
+        if cached in alternatives:
+            try:
+                await self.page.locator(cached).first.wait_for(
+                    state="attached", timeout=SELECTOR_CACHE_CONFIG["hit_wait"]
+                )
+                record_selector(self.selector_cache, self.selector_stats, url, target, cached, cached, hit=True)
+                return cached
+            except PlaywrightTimeoutError:
+                pass
+
+        alternatives = prefer_cached(alternatives, cached)
+        await union_locator(self.page, alternatives).first.wait_for(
+            state="attached", timeout=TEST_CONFIG["wait_timeout"]
+        )
+        for alternative in alternatives:
+            if await self.page.locator(alternative).count() > 0:
+                record_selector(self.selector_cache, self.selector_stats, url, target, cached, alternative, hit=False)
+                return alternative
+        return target
+
+    async def _settle_wait_savings(self):
+        """Actor._settle_wait_savings 的异步版本"""
+        if not self._pending_nav:
+            return
+        result, ready = self._pending_nav
+        self._pending_nav = None
+        try:
+            saved = wait_saved(ready, tuple(await self.page.evaluate(_NETWORKIDLE_ESTIMATE_JS)))
+        except Exception:
+            return
+        if saved is not None:
+            result["wait_saved"] = saved
+
+    async def _screenshot(self, name: str, selector: str = "") -> str:
+        service = get_screenshot_service()
+        if selector:
+            data = await self.page.locator(selector).first.screenshot(**service.capture_options())
+        else:
+            data = await self.page.screenshot(**service.capture_options())
+        return service.store(data, name)
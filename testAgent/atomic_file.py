@@ -0,0 +1,23 @@
+"""
+原子写文件：多个进程（如 run_sharded 的分片）共用同一缓存文件时，避免读到被截断的内容
+"""
+import os
+import tempfile
+from pathlib import Path
+
+
+def write_text_atomic(path: Path, text: str):
+    """先写入同目录下的临时文件，再用 os.replace 原子替换目标文件"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,106 @@
+"""
+BrowserPool - 浏览器池，复用已启动的 Chromium 实例
+"""
+import time
+from typing import List, Optional, Tuple
+from playwright.sync_api import sync_playwright, Browser, Playwright
+from testAgent.config import BROWSER_CONFIG, BROWSER_POOL_CONFIG
+
+
+class BrowserPool:
+    """
+    浏览器池
+    - 按需启动浏览器，归还后保持热状态供下次使用
+    - 限制最大实例数，空闲超时自动关闭
+    - 借出前检查浏览器是否仍然可用
+
+    注意：Playwright 同步 API 绑定创建它的线程，池只能在同一线程中使用。
+    """
+
+    def __init__(self, max_size: Optional[int] = None, idle_timeout: Optional[float] = None):
+        self.max_size = max_size or BROWSER_POOL_CONFIG["max_size"]
+        self.idle_timeout = idle_timeout if idle_timeout is not None else BROWSER_POOL_CONFIG["idle_timeout"]
+        self.playwright: Optional[Playwright] = None
+        self._idle: List[Tuple[Browser, float]] = []
+        self._in_use: List[Browser] = []
+
+    def acquire(self) -> Browser:
+        """借出一个可用的浏览器，没有空闲实例时启动新的"""
+        self.evict_idle()
+        while self._idle:
+            browser, _ = self._idle.pop()
+            if self._is_healthy(browser):
+                self._in_use.append(browser)
+                return browser
+            self._close(browser)
+
+        if len(self._in_use) >= self.max_size:
+            raise RuntimeError(f"浏览器池已满（最大 {self.max_size} 个实例）")
+
+        browser = self._launch()
+        self._in_use.append(browser)
+        return browser
+
+    def release(self, browser: Browser):
+        """归还浏览器；不可用或超出容量时直接关闭"""
+        if browser in self._in_use:
+            self._in_use.remove(browser)
+        # 关闭该浏览器上残留的上下文，保证下一个计划拿到干净的实例
+        if self._is_healthy(browser):
+            for context in list(browser.contexts):
+                try:
+                    context.close()
+                except Exception:
+                    pass
+        if self._is_healthy(browser) and len(self._idle) + len(self._in_use) < self.max_size:
+            self._idle.append((browser, time.monotonic()))
+        else:
+            self._close(browser)
+
+    def evict_idle(self):
+        """关闭空闲时间超过 idle_timeout 的浏览器"""
+        now = time.monotonic()
+        alive: List[Tuple[Browser, float]] = []
+        for browser, released_at in self._idle:
+            if now - released_at > self.idle_timeout or not self._is_healthy(browser):
+                self._close(browser)
+            else:
+                alive.append((browser, released_at))
+        self._idle = alive
+
+    def close_all(self):
+        """关闭池中所有浏览器并停止 Playwright 驱动"""
+        for browser, _ in self._idle:
+            self._close(browser)
+        for browser in self._in_use:
+            self._close(browser)
+        self._idle = []
+        self._in_use = []
+        if self.playwright:
+            self.playwright.stop()
+            self.playwright = None
+
+    def stats(self) -> dict:
+        return {"idle": len(self._idle), "in_use": len(self._in_use), "max_size": self.max_size}
+
+    def _launch(self) -> Browser:
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        return self.playwright.chromium.launch(
+            headless=BROWSER_CONFIG["headless"],
+            slow_mo=BROWSER_CONFIG["slow_mo"]
+        )
+
+    @staticmethod
+    def _is_healthy(browser: Browser) -> bool:
+        try:
+            return browser.is_connected()
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(browser: Browser):
+        try:
+            browser.close()
+        except Exception:
+            pass
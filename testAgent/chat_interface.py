@@ -1,6 +1,9 @@
 """
 对话式测试交互界面
 """
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from rich.console import Console
 from rich.panel import Panel
@@ -8,8 +11,12 @@ from rich.table import Table
 from rich.prompt import Prompt, Confirm
 from testAgent.test_agent import TestAgent
 from testAgent.report_generator import ReportGenerator
+from testAgent.har_store import HarStore, HAR_MODES
 from testAgent.scenarios import HomepageScenario, NavigationScenario
 
+# load <次数>x<并发>[+<爬坡秒数>] <需求>，如 load 50x10+30 创建知识库
+LOAD_COMMAND = re.compile(r"^load\s+(\d+)x(\d+)(?:\+(\d+(?:\.\d+)?)s?)?\s+(.+)$", re.IGNORECASE)
+
 
 class ChatInterface:
     """对话式测试交互界面"""
@@ -55,6 +62,10 @@ class ChatInterface:
   exec <需求>   - 直接生成并执行计划
   report        - 生成测试报告（基于最近结果）
   status        - 查看最近结果摘要
+  har <模式>    - 切换网络模式：live / record / replay
+  cache         - 查看计划缓存命中率
+  cache clear [需求] - 清除全部或指定指令的缓存计划
+  load NxK <需求> - 压测：同一计划执行 N 次，K 个上下文并发（NxK+R 表示 R 秒内逐步加压）
   help          - 显示此帮助信息
   exit          - 退出程序
 
@@ -64,6 +75,8 @@ class ChatInterface:
   > run all
   > plan 测试登录流程
   > exec 测试上传 PDF
+  > har replay
+  > load 50x10+30 测试创建知识库
   > report
         """
         self.console.print(Panel(help_text, title="帮助", border_style="green"))
@@ -193,6 +206,70 @@ class ChatInterface:
             if step.get('message'):
                 self.console.print(f"        {step['message']}")
     
+    def manage_plan_cache(self, command: str):
+        """cache：查看计划缓存统计；cache clear [需求]：清除缓存"""
+        cache = self.agent.planner.cache
+        if cache is None:
+            self.console.print("[yellow]计划缓存未启用（PLAN_CACHE_CONFIG.enabled）[/yellow]")
+            return
+        parts = command.split(" ", 2)
+        if len(parts) > 1 and parts[1].lower() == "clear":
+            instruction = parts[2].strip() if len(parts) > 2 else None
+            removed = cache.invalidate(instruction)
+            self.console.print(f"[green]已清除 {removed} 条缓存计划[/green]")
+            return
+        stats = cache.stats()
+        self.console.print(
+            f"计划缓存: [cyan]{stats['entries']}[/cyan] 条，命中 [green]{stats['hits']}[/green] 次，"
+            f"未命中 [yellow]{stats['misses']}[/yellow] 次，命中率 [cyan]{stats['hit_rate']:.1%}[/cyan]"
+        )
+    
+    def run_load(self, command: str):
+        """解析 load 命令并执行压测"""
+        match = LOAD_COMMAND.match(command)
+        if not match:
+            self.console.print("[yellow]用法: load <次数>x<并发>[+<爬坡秒数>] <需求>，如 load 50x10 测试创建知识库[/yellow]")
+            return
+        iterations, concurrency = int(match.group(1)), int(match.group(2))
+        ramp_up = float(match.group(3) or 0)
+        self.console.print(f"[bold blue]压测执行中: {iterations} 次，并发 {concurrency}...[/bold blue]")
+        # 浏览器池中的同步 Playwright 会在本线程留下运行中的事件循环，asyncio.run 需换到新线程
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(
+                asyncio.run, self.agent.run_load(match.group(4).strip(), iterations, concurrency, ramp_up)
+            ).result()
+        self._display_load_result(result["load"])
+        self.console.print(f"[green]✓ 压测报告已生成: {result['report']}[/green]")
+    
+    def _display_load_result(self, load: Dict[str, Any]):
+        """显示压测结果"""
+        self.console.print(
+            f"\n[bold]压测结果:[/bold] 吞吐量 [cyan]{load['throughput']:.3f} 次/秒[/cyan]，"
+            f"错误率 [red]{load['error_rate']:.2%}[/red]，总时长 [yellow]{load['duration']:.2f} 秒[/yellow]"
+        )
+        table = Table(title="步骤耗时分位数（秒）")
+        table.add_column("步骤", style="cyan")
+        table.add_column("次数", justify="right")
+        table.add_column("失败", justify="right", style="red")
+        table.add_column("p50", justify="right")
+        table.add_column("p95", justify="right")
+        table.add_column("p99", justify="right")
+        for step in load["steps"]:
+            table.add_row(
+                f"{step['id']}. {step['name']}",
+                str(step["count"]),
+                str(step["failed"]),
+                f"{step['p50']:.3f}",
+                f"{step['p95']:.3f}",
+                f"{step['p99']:.3f}",
+            )
+        iteration = load["iteration"]
+        table.add_row(
+            "整体迭代", str(load["iterations"]), str(load["failed"]),
+            f"{iteration['p50']:.3f}", f"{iteration['p95']:.3f}", f"{iteration['p99']:.3f}",
+        )
+        self.console.print(table)
+    
     def run(self):
         """运行对话式界面"""
         self.print_welcome()
@@ -207,6 +284,7 @@ class ChatInterface:
                     continue
                 
                 if command.lower() == "exit" or command.lower() == "quit":
+                    self.agent.shutdown()
                     self.console.print("[yellow]再见！[/yellow]")
                     break
                 
@@ -235,6 +313,21 @@ class ChatInterface:
                     self.last_summary = result["summary"]
                     self._display_summary(result["summary"])
                 
+                elif command.lower().startswith("har"):
+                    parts = command.split(" ", 1)
+                    mode = parts[1].strip().lower() if len(parts) > 1 else ""
+                    if mode in HAR_MODES:
+                        self.agent.har_store = HarStore(mode)
+                        self.console.print(f"[green]网络模式已切换为: {mode}[/green]")
+                    else:
+                        self.console.print(f"[yellow]当前网络模式: {self.agent.har_store.mode}，可选: {' / '.join(HAR_MODES)}[/yellow]")
+                
+                elif command.lower().split(" ", 1)[0] == "cache":
+                    self.manage_plan_cache(command)
+                
+                elif command.lower().startswith("load"):
+                    self.run_load(command)
+                
                 elif command.lower() == "report":
                     # 优先使用最近的计划结果
                     summary_to_use = self.last_summary or last_summary
@@ -258,6 +351,7 @@ class ChatInterface:
                     self.console.print("[yellow]输入 'help' 查看可用命令[/yellow]")
             
             except KeyboardInterrupt:
+                self.agent.shutdown()
                 self.console.print("\n[yellow]程序已中断[/yellow]")
                 break
             except Exception as e:
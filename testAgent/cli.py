@@ -0,0 +1,176 @@
+"""
+无交互的批量执行入口，适用于 CI / 定时任务
+
+    python -m testAgent run plans/ --workers 4 --format junit,html
+
+退出码：0 全部通过；1 存在失败的计划；2 参数或计划文件错误；3 执行环境错误（如浏览器无法启动）；130 被中断
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+from testAgent.config import BROWSER_CONFIG, REPORTS_DIR, TEST_CONFIG
+from testAgent.har_store import HAR_MODES, HarStore
+from testAgent.planner import Plan
+from testAgent.planner_backends import PlanSchemaError, check_step
+from testAgent.report_generator import ReportGenerator
+from testAgent.test_agent import TestAgent
+
+try:  # YAML 计划文件需要 PyYAML，未安装时只支持 JSON
+    import yaml
+except ImportError:  # pragma: no cover - 可选依赖
+    yaml = None
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_ERROR = 3
+EXIT_INTERRUPTED = 130
+
+PLAN_SUFFIXES = (".json", ".yaml", ".yml")
+REPORT_FORMATS = ("html", "txt", "junit", "json")
+_PARSE_ERRORS = (ValueError,) + ((yaml.YAMLError,) if yaml is not None else ())
+
+
+class PlanFileError(Exception):
+    """计划文件无法读取或结构无效"""
+
+
+def find_plan_files(paths: List[str]) -> List[Path]:
+    """展开目录（按文件名排序），保留显式给出的文件顺序"""
+    files: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in PLAN_SUFFIXES))
+        elif path.exists():
+            files.append(path)
+        else:
+            raise PlanFileError(f"路径不存在: {path}")
+    return files
+
+
+def load_plans(path: Path) -> List[Plan]:
+    """读取 Plan.to_dict() 格式的计划，一个文件可以包含单个计划或计划列表"""
+    if path.suffix in (".yaml", ".yml") and yaml is None:
+        raise PlanFileError(f"{path}: 读取 YAML 需要安装 PyYAML")
+    text = path.read_text(encoding="utf-8")
+    try:
+        data = yaml.safe_load(text) if path.suffix in (".yaml", ".yml") else json.loads(text)
+    except _PARSE_ERRORS as exc:
+        raise PlanFileError(f"{path}: 解析失败: {exc}")
+
+    plans: List[Plan] = []
+    for index, item in enumerate(data if isinstance(data, list) else [data]):
+        if not isinstance(item, dict) or not item.get("instruction") or not item.get("steps"):
+            raise PlanFileError(f"{path}[{index}]: 计划需要包含 instruction 与 steps")
+        try:
+            steps = [check_step(step, n) for n, step in enumerate(item["steps"], 1)]
+        except PlanSchemaError as exc:
+            raise PlanFileError(f"{path}[{index}]: {exc}")
+        plans.append(Plan.from_dict(dict(item, steps=steps)))
+    return plans
+
+
+def print_result(source: str, scenario: Dict[str, Any]):
+    """每个计划完成后立即输出一行结果"""
+    mark = "PASS" if scenario["status"] == "passed" else "FAIL"
+    print(f"{mark}  {source}  {scenario['name']} ({scenario['duration']:.2f}s)", flush=True)
+    if scenario["status"] != "passed" and scenario.get("error_message"):
+        print(f"      {scenario['error_message']}", flush=True)
+
+
+def write_reports(summary: Dict[str, Any], formats: List[str], output: Path) -> List[str]:
+    generator = ReportGenerator()
+    generator.reports_dir = output
+    output.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for fmt in formats:
+        if fmt == "html":
+            paths.append(generator.generate_html_report(summary))
+        elif fmt == "txt":
+            paths.append(generator.generate_text_report(summary))
+        elif fmt == "junit":
+            paths.append(generator.generate_junit_report(summary))
+        elif fmt == "json":
+            path = output / "summary.json"
+            path.write_text(json.dumps(summary, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+            paths.append(str(path))
+    return paths
+
+
+def run(args: argparse.Namespace) -> int:
+    formats = [f.strip() for f in args.format.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in REPORT_FORMATS]
+    if unknown:
+        print(f"未知的报告格式: {', '.join(unknown)}（可选 {', '.join(REPORT_FORMATS)}）", file=sys.stderr)
+        return EXIT_USAGE
+
+    jobs: List[Tuple[str, Plan]] = []
+    try:
+        for path in find_plan_files(args.paths):
+            jobs.extend((path.name, plan) for plan in load_plans(path))
+    except PlanFileError as exc:
+        print(str(exc), file=sys.stderr)
+        return EXIT_USAGE
+    if not jobs:
+        print("没有找到计划文件", file=sys.stderr)
+        return EXIT_USAGE
+
+    # CI 环境没有显示器，默认无头且不放慢操作
+    if not args.headed:
+        BROWSER_CONFIG["headless"] = True
+        BROWSER_CONFIG["slow_mo"] = 0
+
+    agent = TestAgent()
+    if args.har:
+        agent.har_store = HarStore(args.har)
+    print(f"执行 {len(jobs)} 个计划，并发 {args.workers}", flush=True)
+    try:
+        result = asyncio.run(agent.run_plans(
+            [plan for _, plan in jobs],
+            max_pages=args.workers,
+            on_result=lambda index, scenario: print_result(jobs[index][0], scenario),
+        ))
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    except Exception as exc:
+        print(f"执行失败: {exc}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        agent.shutdown()
+
+    summary = result["summary"]
+    for (source, _), scenario in zip(jobs, summary["scenarios"]):
+        scenario["source"] = source
+    for path in write_reports(summary, formats, Path(args.output)):
+        print(f"报告: {path}")
+    print(f"通过 {summary['passed']}，失败 {summary['failed']}，耗时 {summary['duration']:.2f}s")
+    return EXIT_OK if summary["failed"] == 0 else EXIT_FAILED
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m testAgent", description="批量执行测试计划")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="执行计划文件或目录中的全部计划（JSON / YAML）")
+    run_parser.add_argument("paths", nargs="+", help="计划文件或目录")
+    run_parser.add_argument(
+        "--workers", type=int, default=TEST_CONFIG["async_max_pages"], help="同时执行的计划数"
+    )
+    run_parser.add_argument(
+        "--format", default="html", help=f"报告格式，逗号分隔：{', '.join(REPORT_FORMATS)}"
+    )
+    run_parser.add_argument("--output", default=str(REPORTS_DIR), help="报告输出目录")
+    run_parser.add_argument("--har", choices=HAR_MODES, help="网络模式，默认读取 HAR_CONFIG")
+    run_parser.add_argument("--headed", action="store_true", help="显示浏览器窗口")
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.workers < 1:
+        print("--workers 必须大于 0", file=sys.stderr)
+        return EXIT_USAGE
+    return run(args)
@@ -9,6 +9,7 @@ BASE_DIR = Path(__file__).parent
 REPORTS_DIR = BASE_DIR / "reports"
 SCREENSHOTS_DIR = BASE_DIR / "screenshots"
 SCENARIOS_DIR = BASE_DIR / "scenarios"
+TRACES_DIR = BASE_DIR / "traces"
 
 # 创建必要的目录
 REPORTS_DIR.mkdir(exist_ok=True)
@@ -27,13 +28,122 @@ BROWSER_CONFIG = {
     "timeout": 30000,  # 默认超时时间（毫秒）
 }
 
+# 浏览器池配置：复用已启动的 Chromium，避免每次执行都重新拉起进程
+BROWSER_POOL_CONFIG = {
+    "max_size": 2,  # 池中最多保留的浏览器实例数
+    "idle_timeout": 300,  # 空闲超过该秒数的浏览器会被关闭
+}
+
 # 测试配置
 TEST_CONFIG = {
     "screenshot_on_failure": True,
     "screenshot_on_success": False,
-    "video_on_failure": True,
-    "retry_count": 2,
+    "trace_on_failure": True,  # 记录滚动的 Playwright trace，仅在步骤失败时导出
+    "trace_window": 5,  # 每个 trace chunk 的步骤数，通过的 chunk 直接丢弃，失败时导出当前 chunk
+    "trace_keep_previous": False,  # 失败时同时导出上一个 chunk；每次换 chunk 都要写盘，排查时再开启
+    "retry_count": 2,  # 单个步骤遇到可重试错误（超时、元素脱离 DOM）时的最大重试次数
+    "retry_backoff": 0.5,  # 首次重试前的等待（秒）
+    "retry_backoff_factor": 2.0,  # 每次重试等待时间的增长倍数
+    "retry_budget": 5,  # 每个计划累计允许的重试次数
     "wait_timeout": 5000,
+    # 前置步骤失败时直接将依赖它的步骤标记为 blocked，不再操作浏览器
+    # 步骤未声明 depends_on 时默认依赖上一步
+    "fail_fast": True,
+    # 将同一页面上连续的 fill 合并为一次浏览器调用，减少驱动往返；click 仍逐步执行以保留可操作性检查
+    "fuse_steps": True,
+    # 记录每步各阶段耗时（选择器解析、自动等待、动作、导航、截图等），导出为 Chrome trace event
+    # 开启后每个 click / fill / upload 前会多一次等待往返，仅在分析性能时打开
+    "phase_timing": False,
+    # goto 步骤采集 Navigation Timing、FCP、LCP、CLS、TBT 与传输体积
+    "collect_web_metrics": True,
+    "scenario_workers": 1,  # run_all_scenarios 的并发数，1 表示串行共用一个页面
+    "shard_processes": os.cpu_count() or 1,  # run_sharded 的默认进程数
+    "async_max_pages": 4,  # run_plans 同时打开的页面上限
+    # goto 默认就绪策略：commit / domcontentloaded / load / networkidle / selector:<css>
+    "default_wait_until": "networkidle",
+    "report_wait_savings": True,  # 估算每个 goto 相比 networkidle 节省的等待时间
+    "routing_profile": "full",  # 计划未指定时使用的请求路由配置，见 ROUTING_PROFILES
+}
+
+# 计划优化：执行前去掉重复导航与等待，estimates 为报告中估算节省时间用的单步耗时（秒）
+OPTIMIZER_CONFIG = {
+    "enabled": True,
+    "estimates": {"goto": 1.5, "wait_for_selector": 0.3, "wait_for_text": 0.3},
+}
+
+# 计划预检：启动浏览器前检查动作、选择器、文件、占位符与地址可达性
+PREFLIGHT_CONFIG = {
+    "enabled": True,
+    "check_urls": True,  # 对 goto / API 地址发送 HEAD 请求，HAR 回放模式下自动跳过
+    "head_timeout": 3,  # HEAD 请求超时（秒）
+}
+
+# 选择器解析缓存：记录多候选 target 实际命中的候选，后续执行优先尝试
+SELECTOR_CACHE_CONFIG = {
+    "enabled": True,
+    "path": BASE_DIR / ".cache" / "selector_cache.json",
+    "max_entries": 500,
+    "hit_wait": 1000,  # 优先等待缓存候选出现的时间（毫秒），超时后再等待任一候选
+}
+
+# 规划器配置：意图规则文件（JSON，安装 PyYAML 后也支持 YAML），启动时编译为关键词索引
+PLANNER_CONFIG = {
+    "rules_path": BASE_DIR / "intents.json",
+    # 规划后端：keyword 使用意图规则；llm 调用 HTTP 规划服务，超时或出错时回退到 keyword
+    "backend": "keyword",
+    "llm_url": "http://127.0.0.1:8765/plan",  # 本地可用 python -m testAgent.stub_llm_server 启动桩服务
+    "llm_model": "",
+    "llm_api_key_env": "PLANNER_API_KEY",  # 存放 API Key 的环境变量名
+    "llm_timeout": 10,  # 单个指令规划的总超时（秒）
+    "llm_connect_timeout": 3,  # 建立连接及单次读取的超时（秒）
+    "llm_pool_size": 4,  # 连接池大小，也是并发规划的上限
+}
+
+# 计划缓存：相同指令（归一化后）只规划一次，规划器版本变化时自动失效
+PLAN_CACHE_CONFIG = {
+    "enabled": True,
+    "path": BASE_DIR / ".cache" / "plan_cache.json",
+    "max_entries": 200,
+    "ttl": 7 * 24 * 3600,  # 缓存计划的有效期（秒），0 表示不过期
+}
+
+# HAR 录制/回放配置
+# live: 直接访问线上站点；record: 执行时把网络交互录制为每个计划一个 HAR；
+# replay: 完全从 HAR 回放，未录制的请求直接中止，可离线、可重复地运行
+HAR_CONFIG = {
+    "mode": "live",
+    "dir": BASE_DIR / "hars",
+}
+
+# 请求路由配置：按资源类型与域名放行/拦截请求，减少与测试无关的下载
+# allow_* 非空时只放行列表中的项；deny_* 中的项总是被拦截；域名匹配包含子域名
+ROUTING_PROFILES = {
+    "full": {},
+    "no-media": {
+        "deny_types": ["image", "media", "font"],
+    },
+    "minimal": {
+        "deny_types": ["image", "media", "font", "texttrack", "eventsource", "manifest"],
+        "allow_hosts": ["opencsg.com"],
+        "deny_hosts": ["google-analytics.com", "googletagmanager.com", "hm.baidu.com"],
+    },
+}
+
+# 被拦截请求的体积估算（字节），未从历史响应中获知实际大小时使用
+ROUTING_SIZE_ESTIMATES = {
+    "image": 50_000,
+    "media": 500_000,
+    "font": 40_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+}
+
+# 截图配置：后台线程写盘，按内容哈希去重存储
+SCREENSHOT_CONFIG = {
+    "format": "jpeg",  # png / jpeg / webp（webp 需要安装 Pillow，否则退回 png）
+    "quality": 80,  # jpeg / webp 质量
+    "workers": 2,  # 后台编码与写盘线程数
+    "dir": SCREENSHOTS_DIR / "store",
 }
 
 # 登录配置（如果需要）
@@ -43,3 +153,10 @@ LOGIN_CONFIG = {
     "login_url": "https://iam.opencsg.com/login",
 }
 
+# 登录态缓存配置：登录一次后保存 storage_state，供需要登录的计划复用
+SESSION_CONFIG = {
+    "enabled": True,  # False 时不读写缓存文件，每个进程登录一次并只在内存中复用
+    "storage_state_path": BASE_DIR / ".auth" / "storage_state.json",
+    "ttl": 3600,  # 缓存有效期（秒）
+}
+
@@ -0,0 +1,63 @@
+"""
+HarStore - 按计划录制与回放 HAR，用于离线、可重复的执行
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import BrowserContext
+from testAgent.config import HAR_CONFIG
+
+HAR_MODES = ("live", "record", "replay")
+
+
+class HarStore:
+    """
+    HAR 存储
+    - record：通过 route_from_har(update=True) 录制，关闭上下文时写入磁盘
+    - replay：只从 HAR 返回响应，未命中的请求直接中止，不访问网络
+    """
+
+    def __init__(self, mode: Optional[str] = None, directory: Optional[Path] = None):
+        self.mode = mode or HAR_CONFIG["mode"]
+        if self.mode not in HAR_MODES:
+            raise ValueError(f"未知的 HAR 模式: {self.mode}")
+        self.directory = Path(directory or HAR_CONFIG["dir"])
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "replay"
+
+    def path_for(self, key: str) -> Path:
+        """同一条指令总是映射到同一个 HAR 文件"""
+        digest = hashlib.sha1(key.strip().lower().encode("utf-8")).hexdigest()[:12]
+        return self.directory / f"plan_{digest}.har"
+
+    def apply(self, context: BrowserContext, key: str):
+        """按当前模式为上下文安装 HAR 路由，需在其它 context.route 之前调用"""
+        path = self._prepare(key)
+        if path is None:
+            return
+        if self.mode == "record":
+            context.route_from_har(str(path), update=True, update_content="embed")
+        else:
+            context.route_from_har(str(path), not_found="abort")
+
+    async def apply_async(self, context, key: str):
+        """异步 API 版本的 apply"""
+        path = self._prepare(key)
+        if path is None:
+            return
+        if self.mode == "record":
+            await context.route_from_har(str(path), update=True, update_content="embed")
+        else:
+            await context.route_from_har(str(path), not_found="abort")
+
+    def _prepare(self, key: str) -> Optional[Path]:
+        if self.mode == "live" or not key:
+            return None
+        path = self.path_for(key)
+        if self.mode == "record":
+            self.directory.mkdir(parents=True, exist_ok=True)
+        elif not path.exists():
+            raise FileNotFoundError(f"未找到可回放的 HAR: {path}，请先以 record 模式执行该计划")
+        return path
@@ -0,0 +1,131 @@
+"""
+IntentRules - 声明式意图规则与多关键词索引
+"""
+import hashlib
+import json
+from collections import deque
+from pathlib import Path
+from string import Template
+from typing import Dict, Any, Iterator, List, Tuple
+from testAgent.config import BASE_URL, TARGET_URL, ROUTING_PROFILES
+
+try:  # YAML 规则文件需要 PyYAML，未安装时只支持 JSON
+    import yaml
+except ImportError:  # pragma: no cover - 可选依赖
+    yaml = None
+
+# 规则文件中可引用的配置项，如 "$TARGET_URL"
+_RULE_VARIABLES = {"TARGET_URL": TARGET_URL, "BASE_URL": BASE_URL}
+
+
+class KeywordIndex:
+    """
+    Aho-Corasick 多模式匹配：所有关键词编译为一个自动机，
+    对指令只扫描一遍即可找出全部命中，耗时与关键词数量无关
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Any]] = [[]]
+
+    def add(self, keyword: str, payload: Any):
+        node = 0
+        for ch in keyword.lower():
+            if ch not in self._goto[node]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][ch] = len(self._goto) - 1
+            node = self._goto[node][ch]
+        self._output[node].append(payload)
+
+    def build(self):
+        """按广度优先计算失败指针，并把后缀节点的输出合并到当前节点"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, Any]]:
+        """逐个返回 (命中结束位置, payload)"""
+        node = 0
+        for position, ch in enumerate(text.lower()):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for payload in self._output[node]:
+                yield position, payload
+
+
+def _least_restrictive(profiles: List[str]) -> str:
+    """组合多个意图时取限制最少的路由配置；"" 表示使用默认配置"""
+    if not profiles or "" in profiles:
+        return ""
+    order = list(ROUTING_PROFILES)
+    return min(profiles, key=lambda p: order.index(p) if p in order else 0)
+
+
+class IntentRules:
+    """
+    意图规则
+    - 从 JSON/YAML 文件加载，按声明顺序组合：前置意图（如登录）应写在前面
+    - 每个意图包含关键词、步骤以及 requires_auth / provides_auth / routing_profile
+    - 一条指令命中多个意图时，步骤按规则顺序拼接并重新编号
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.intents: List[Dict[str, Any]] = data.get("intents", [])
+        self.default: Dict[str, Any] = data.get("default", {"steps": []})
+        self.digest = hashlib.sha1(
+            json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:8]
+        self.index = KeywordIndex()
+        for order, intent in enumerate(self.intents):
+            for keyword in intent.get("keywords", []):
+                self.index.add(keyword, order)
+        self.index.build()
+
+    @classmethod
+    def load(cls, path: Path) -> "IntentRules":
+        text = Template(Path(path).read_text(encoding="utf-8")).safe_substitute(_RULE_VARIABLES)
+        if Path(path).suffix in (".yaml", ".yml"):
+            if yaml is None:
+                raise RuntimeError(f"加载 {path} 需要安装 PyYAML")
+            return cls(yaml.safe_load(text) or {})
+        return cls(json.loads(text))
+
+    def match(self, instruction: str) -> List[Dict[str, Any]]:
+        """返回命中的意图，按规则声明顺序排列"""
+        matched = {order for _, order in self.index.search(instruction)}
+        return [self.intents[order] for order in sorted(matched)]
+
+    def compose(self, instruction: str) -> Dict[str, Any]:
+        """
+        将命中的意图组合为一个计划字典；未命中任何意图时使用 default。
+        组合计划中包含提供登录态的意图时，由计划自行登录，不再复用缓存的登录态。
+        """
+        intents = self.match(instruction) or [self.default]
+        steps: List[Dict[str, Any]] = []
+        for intent in intents:
+            offset = len(steps)
+            for step in intent.get("steps", []):
+                step = dict(step)
+                step["id"] = step["id"] + offset
+                if step.get("depends_on") is not None:
+                    step["depends_on"] = [dep + offset for dep in step["depends_on"]]
+                steps.append(step)
+        provides_auth = any(intent.get("provides_auth") for intent in intents)
+        return {
+            "instruction": instruction,
+            "steps": steps,
+            "requires_auth": not provides_auth and any(intent.get("requires_auth") for intent in intents),
+            "routing_profile": _least_restrictive([intent.get("routing_profile", "") for intent in intents]),
+            "intents": [intent["name"] for intent in intents if intent.get("name")],
+        }
@@ -0,0 +1,105 @@
+"""
+PlanCache - Planner 生成结果的磁盘缓存
+"""
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional
+from testAgent.config import PLAN_CACHE_CONFIG
+from testAgent.atomic_file import write_text_atomic
+
+
+def normalize_instruction(instruction: str) -> str:
+    """去除首尾空白、合并连续空白并转小写，使等价的指令命中同一条缓存"""
+    return re.sub(r"\s+", " ", instruction.strip()).lower()
+
+
+class PlanCache:
+    """
+    计划缓存
+    - 以 规划器版本 + 归一化指令 为键，版本变化后旧计划自然失效
+    - 持久化到磁盘，超过 TTL 的条目视为未命中，超出容量时淘汰最久未使用的条目
+    - 记录命中率，便于评估规划开销
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.path = Path(path or PLAN_CACHE_CONFIG["path"])
+        self.max_entries = max_entries or PLAN_CACHE_CONFIG["max_entries"]
+        self.ttl = ttl if ttl is not None else PLAN_CACHE_CONFIG["ttl"]
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def key(instruction: str, version: str) -> str:
+        return f"{version}|{normalize_instruction(instruction)}"
+
+    def get(self, instruction: str, version: str) -> Optional[Dict[str, Any]]:
+        """返回缓存的计划字典；未命中或已过期时返回 None"""
+        key = self.key(instruction, version)
+        entry = self.entries.get(key)
+        if entry and self.ttl and time.time() - entry["created_at"] > self.ttl:
+            del self.entries[key]
+            self.save()
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["last_used"] = time.time()
+        return entry["plan"]
+
+    def put(self, instruction: str, version: str, plan: Dict[str, Any]):
+        now = time.time()
+        self.entries[self.key(instruction, version)] = {
+            "plan": plan,
+            "created_at": now,
+            "last_used": now,
+        }
+        self.save()
+
+    def invalidate(self, instruction: Optional[str] = None) -> int:
+        """删除指定指令（所有版本）的缓存；不传指令时清空全部，返回删除的条目数"""
+        if instruction is None:
+            removed = len(self.entries)
+            self.entries = {}
+        else:
+            suffix = f"|{normalize_instruction(instruction)}"
+            keys = [key for key in self.entries if key.endswith(suffix)]
+            for key in keys:
+                del self.entries[key]
+            removed = len(keys)
+        if removed:
+            self.save()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        # 超出容量时淘汰最久未使用的条目
+        if len(self.entries) > self.max_entries:
+            ordered = sorted(self.entries.items(), key=lambda kv: kv[1].get("last_used", 0), reverse=True)
+            self.entries = dict(ordered[:self.max_entries])
+        write_text_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2))
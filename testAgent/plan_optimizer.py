@@ -0,0 +1,130 @@
+"""
+PlanOptimizer - 在 Planner 与 Actor 之间精简计划步骤
+"""
+import re
+from typing import Dict, Any, List, Optional
+from testAgent.config import OPTIMIZER_CONFIG
+from testAgent.actor import SELECTOR_PREFIX
+from testAgent.selector_cache import split_alternatives
+
+# 只读取页面、不改变页面或服务端状态的动作。其余动作之后无法确定重新导航是否多余：
+# click 可能跳转，fill / upload 改变了页面状态，API 步骤改变了服务端数据（之后的 goto 往往是有意刷新）
+_READ_ONLY = ("wait_for_text", "wait_for_selector", "screenshot")
+_WAITS = ("wait_for_selector", "wait_for_text")
+# 显式选择器引擎前缀（text=、xpath=、role= 等）
+_ENGINE_PREFIX = re.compile(r"^\s*[a-zA-Z_-]+=")
+
+
+def _mergeable_wait(target: str) -> bool:
+    """
+    goto 的 selector: 就绪策略把整个字符串当作一个选择器等待，只有 CSS 的逗号才是"任一匹配"。
+    单个候选可以原样等待；多个候选必须都是普通 CSS（不含引擎前缀、XPath 或 >> 链），
+    否则 wait_for_selector 按候选逐个解析的语义会丢失
+    """
+    alternatives = split_alternatives(target)
+    if len(alternatives) == 1:
+        return True
+    return not any(
+        _ENGINE_PREFIX.match(alt) or alt.lstrip().startswith(("//", "..")) or ">>" in alt
+        for alt in alternatives
+    )
+
+
+class PlanOptimizer:
+    """
+    计划优化
+    - 去掉导航到当前页面的 goto：两次导航之间只有只读步骤时才视为重复
+      （声明了性能预算的 goto 保留，以免漏测）
+    - goto 之后紧跟的 wait_for_selector 并入 goto 的就绪策略（多个候选时仅限普通 CSS），
+      相邻的相同等待只保留一个
+    - 计划中途的截图与后续步骤解耦：后续步骤不再隐式依赖它，截图失败不会阻断流程；
+      截图仍按顺序执行，这一项不节省时间
+    步骤保持原始 id，被移除步骤上的显式依赖改指向吸收它的步骤。
+    """
+
+    def __init__(self, estimates: Optional[Dict[str, float]] = None):
+        self.estimates = estimates or OPTIMIZER_CONFIG["estimates"]
+
+    def optimize(self, steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """返回 {"steps", "removed", "decoupled", "estimated_saved"}，不修改传入的步骤"""
+        kept: List[Dict[str, Any]] = []
+        removed: List[Dict[str, Any]] = []
+        absorbed: Dict[Any, Any] = {}
+        current_url: Optional[str] = None
+
+        def drop(step: Dict[str, Any], into: Dict[str, Any], reason: str):
+            absorbed[step.get("id")] = into.get("id")
+            removed.append({
+                "id": step.get("id"),
+                "action": step.get("action"),
+                "target": step.get("target", ""),
+                "reason": reason,
+                "estimated_saved": self.estimates.get(step.get("action"), 0.0),
+            })
+
+        for step in steps:
+            step = dict(step)
+            action = step.get("action")
+            previous = kept[-1] if kept else None
+            target = step.get("target", "").strip()
+
+            if action == "goto":
+                if previous and target == current_url and not step.get("budgets"):
+                    drop(step, previous, "已位于该页面，无需重复导航")
+                    continue
+                current_url = target
+            elif action not in _READ_ONLY:
+                current_url = None
+
+            if action == "wait_for_selector" and previous and previous.get("action") == "goto":
+                wait_until = previous.get("wait_until", "")
+                if not wait_until and _mergeable_wait(target):
+                    previous["wait_until"] = SELECTOR_PREFIX + target
+                    drop(step, previous, "并入上一步 goto 的就绪等待")
+                    continue
+                if wait_until.startswith(SELECTOR_PREFIX) and wait_until[len(SELECTOR_PREFIX):].strip() == target:
+                    drop(step, previous, "上一步 goto 已等待同一选择器")
+                    continue
+
+            if (
+                action in _WAITS
+                and previous
+                and previous.get("action") == action
+                and previous.get("target", "").strip() == target
+            ):
+                drop(step, previous, "与上一步等待条件相同")
+                continue
+
+            kept.append(step)
+
+        for step in kept:
+            if step.get("depends_on"):
+                step["depends_on"] = list(dict.fromkeys(absorbed.get(dep, dep) for dep in step["depends_on"]))
+
+        decoupled = self._decouple_screenshots(kept)
+        return {
+            "steps": kept,
+            "removed": removed,
+            "decoupled": decoupled,
+            "estimated_saved": round(sum(r["estimated_saved"] for r in removed), 3),
+        }
+
+    @staticmethod
+    def _decouple_screenshots(steps: List[Dict[str, Any]]) -> List[Any]:
+        """
+        中途截图只用于报告展示：让它与下一步都依赖截图之前的步骤，
+        截图失败时后续步骤照常执行（fail-fast 不再因截图阻断），执行顺序与耗时不变。
+        被其他步骤显式依赖的截图保持原样。
+        """
+        referenced = {dep for step in steps for dep in step.get("depends_on") or []}
+        decoupled: List[Any] = []
+        for index in range(1, len(steps) - 1):
+            shot, before, after = steps[index], steps[index - 1], steps[index + 1]
+            if shot.get("action") != "screenshot" or shot.get("id") in referenced:
+                continue
+            if shot.get("depends_on") is None:
+                shot["depends_on"] = [before.get("id")]
+            if after.get("depends_on") is None:
+                after["depends_on"] = list(shot["depends_on"])
+            decoupled.append(shot.get("id"))
+        return decoupled
@@ -0,0 +1,162 @@
+"""
+PlanValidator - 启动浏览器前对计划做静态预检
+"""
+import os
+import re
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from testAgent.config import PREFLIGHT_CONFIG
+from testAgent.actor import ACTIONS, SELECTOR_PREFIX
+from testAgent.api_actions import API_ACTIONS, resolve_url
+
+# target 为选择器的动作
+SELECTOR_ACTIONS = ("click", "fill", "upload", "wait_for_selector")
+# value 为本地文件路径的动作
+FILE_ACTIONS = ("upload", "api_upload")
+
+# Playwright 选择器引擎前缀，前缀之后的内容不按 CSS 语法检查
+_ENGINE_PREFIX = re.compile(r"^(text|xpath|css|id|data-testid|role|nth|internal:[\w-]+)=")
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_PAIRS = {")": "(", "]": "["}
+
+
+@dataclass
+class ValidationIssue:
+    """预检发现的问题；level 为 error 时计划不会执行"""
+    step_id: Any
+    level: str
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"step_id": self.step_id, "level": self.level, "message": self.message}
+
+
+def selector_syntax_error(target: str) -> Optional[str]:
+    """
+    检查选择器的基本语法：引号与括号配对、候选不为空、不以组合符结尾。
+    无浏览器时无法完整解析 CSS，只拦截必然失败的写法。
+    """
+    if not target.strip():
+        return "选择器为空"
+    stack: List[str] = []
+    quote = ""
+    current = ""
+    pieces: List[str] = []
+    for ch in target:
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([":
+            stack.append(ch)
+        elif ch in ")]":
+            if not stack or stack.pop() != _PAIRS[ch]:
+                return f"括号不匹配: {target}"
+        elif ch == "," and not stack:
+            pieces.append(current)
+            current = ""
+            continue
+        current += ch
+    pieces.append(current)
+    if quote:
+        return f"引号未闭合: {target}"
+    if stack:
+        return f"括号未闭合: {target}"
+    for piece in pieces:
+        piece = piece.strip()
+        if not piece:
+            return f"存在空的候选选择器: {target}"
+        if _ENGINE_PREFIX.match(piece) or piece.startswith("//"):
+            continue
+        if piece[-1] in ">+~" or piece[0] in "+~":
+            return f"选择器以组合符开头或结尾: {piece}"
+    return None
+
+
+def check_url(url: str, timeout: float) -> Optional[str]:
+    """用 HEAD 请求检查地址可达；能收到任意 HTTP 响应即视为可达"""
+    request = urllib.request.Request(url, method="HEAD")
+    try:
+        urllib.request.urlopen(request, timeout=timeout).close()
+    except urllib.error.HTTPError as exc:
+        if exc.code >= 500:
+            return f"{url} 返回 {exc.code}"
+    except (urllib.error.URLError, OSError) as exc:
+        reason = getattr(exc, "reason", exc)
+        return f"无法访问 {url}: {reason}"
+    return None
+
+
+class PlanValidator:
+    """
+    计划预检
+    - 未知动作、选择器语法、上传文件是否存在
+    - {{NAME}} 占位符：既不是前序步骤捕获的变量，也没有对应环境变量
+    - goto / API 地址是否可达（HEAD 请求，并发执行）
+    """
+
+    def __init__(self, check_urls: Optional[bool] = None, timeout: Optional[float] = None):
+        self.check_urls = PREFLIGHT_CONFIG["check_urls"] if check_urls is None else check_urls
+        self.timeout = timeout or PREFLIGHT_CONFIG["head_timeout"]
+
+    def validate(self, plan: Dict[str, Any]) -> List[ValidationIssue]:
+        issues: List[ValidationIssue] = []
+        captured: set = set()
+        urls: Dict[str, Any] = {}
+
+        for step in plan.get("steps", []):
+            step_id = step.get("id")
+            action = step.get("action")
+            target = step.get("target", "")
+            value = step.get("value", "")
+
+            if action not in ACTIONS:
+                issues.append(ValidationIssue(step_id, "error", f"未知动作: {action}"))
+                continue
+
+            for text in (target, value):
+                for name in _PLACEHOLDER.findall(text):
+                    if name not in captured and not os.getenv(name):
+                        issues.append(ValidationIssue(step_id, "error", f"环境变量 {name} 未设置"))
+
+            selectors = []
+            if action in SELECTOR_ACTIONS:
+                selectors.append(target)
+            elif action == "screenshot" and value:
+                selectors.append(value)
+            wait_until = step.get("wait_until", "")
+            if action == "goto" and wait_until.startswith(SELECTOR_PREFIX):
+                selectors.append(wait_until[len(SELECTOR_PREFIX):])
+            for selector in selectors:
+                error = selector_syntax_error(selector)
+                if error:
+                    issues.append(ValidationIssue(step_id, "error", error))
+
+            if action in FILE_ACTIONS and not _PLACEHOLDER.search(value) and not Path(value).exists():
+                issues.append(ValidationIssue(step_id, "error", f"未找到上传文件: {value}"))
+
+            # 含运行时变量的地址无法预先检查
+            if action == "goto" or action in API_ACTIONS:
+                url = target if action == "goto" else resolve_url(target)
+                if _PLACEHOLDER.search(url):
+                    pass
+                elif urlparse(url).scheme not in ("http", "https"):
+                    issues.append(ValidationIssue(step_id, "error", f"无效地址: {url}"))
+                else:
+                    urls.setdefault(url, step_id)
+
+            captured.update((step.get("capture") or {}).keys())
+
+        if self.check_urls and urls:
+            with ThreadPoolExecutor(max_workers=min(8, len(urls))) as executor:
+                errors = executor.map(lambda url: check_url(url, self.timeout), urls)
+                for (url, step_id), error in zip(urls.items(), errors):
+                    if error:
+                        issues.append(ValidationIssue(step_id, "error", error))
+        return issues
@@ -3,8 +3,17 @@ Planner - 从自然语言需求生成结构化测试计划
 """
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any
-from testAgent.config import TARGET_URL
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from testAgent.config import PLANNER_CONFIG
+from testAgent.plan_cache import PlanCache
+from testAgent.intent_rules import IntentRules
+from testAgent.planner_backends import KeywordBackend, PlannerBackend, PlannerBackendError, create_backend
+
+# 规划逻辑变化时递增，使缓存中的旧计划失效；规则文件内容的摘要也会并入缓存版本
+PLANNER_VERSION = "2"
 
 
 @dataclass
@@ -16,6 +25,21 @@ class PlanStep:
     value: str = ""
     expect: str = ""
     note: str = ""
+    # goto 的就绪策略：commit / domcontentloaded / load / networkidle / selector:<css>
+    # 为空时使用 TEST_CONFIG["default_wait_until"]
+    wait_until: str = ""
+    # 前置步骤 id 列表；None 表示依赖上一步，[] 表示不依赖任何步骤
+    depends_on: Optional[List[int]] = None
+    # goto 的性能预算，如 {"lcp": 2500, "cls": 0.1}；时间单位毫秒，transfer_size 单位字节
+    budgets: Dict[str, float] = field(default_factory=dict)
+    # API 步骤的响应断言，如 {"status": 201, "data.name": "示例"}；"*" 表示字段存在即可
+    assertions: Dict[str, Any] = field(default_factory=dict)
+    # 从 API 响应捕获变量：变量名 -> JSON 路径，后续步骤以 {{变量名}} 引用
+    capture: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanStep":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -25,6 +49,11 @@ class PlanStep:
             "value": self.value,
             "expect": self.expect,
             "note": self.note,
+            "wait_until": self.wait_until,
+            "depends_on": self.depends_on,
+            "budgets": self.budgets,
+            "assertions": self.assertions,
+            "capture": self.capture,
         }
 
 
@@ -34,166 +63,107 @@ class Plan:
     instruction: str
     steps: List[PlanStep] = field(default_factory=list)
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    requires_auth: bool = False  # 是否需要以已登录状态开始执行
+    routing_profile: str = ""  # 请求路由配置，见 config.ROUTING_PROFILES
+    intents: List[str] = field(default_factory=list)  # 组合出该计划的意图名称
+    planner: str = ""  # 实际生成该计划的规划后端，LLM 回退时为 keyword
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Plan":
+        fields = {k: v for k, v in data.items() if k in cls.__dataclass_fields__ and k != "steps"}
+        return cls(steps=[PlanStep.from_dict(s) for s in data.get("steps", [])], **fields)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             "instruction": self.instruction,
             "created_at": self.created_at,
+            "requires_auth": self.requires_auth,
+            "routing_profile": self.routing_profile,
+            "intents": self.intents,
+            "planner": self.planner,
             "steps": [s.to_dict() for s in self.steps],
         }
 
 
+@lru_cache(maxsize=8)
+def _load_rules(path: str, mtime: float) -> IntentRules:
+    """按路径与修改时间缓存编译好的规则，规则文件修改后自动重新加载"""
+    return IntentRules.load(Path(path))
+
+
+def load_rules(path: Optional[Path] = None) -> IntentRules:
+    path = Path(path or PLANNER_CONFIG["rules_path"])
+    return _load_rules(str(path), path.stat().st_mtime)
+
+
 class Planner:
     """
     Planner（规划者）
     - 接收自然语言指令
     - 输出结构化测试计划（JSON）
+    - 规划由后端完成：默认使用关键词规则，也可接入 HTTP LLM 服务
     """
 
-    def __init__(self) -> None:
-        self.default_steps = [
-            PlanStep(
-                id=1,
-                action="goto",
-                target=TARGET_URL,
-                expect="页面加载成功，核心区域可见",
-                note="打开 AgentHub 首页",
-            ),
-            PlanStep(
-                id=2,
-                action="wait_for_selector",
-                target="main, [role='main'], .main-content, #main",
-                expect="主内容区域出现",
-                note="等待主内容渲染完成",
-            ),
-            PlanStep(
-                id=3,
-                action="screenshot",
-                target="homepage_loaded",
-                expect="保存首页截图",
-                note="用于报告展示",
-            ),
-        ]
+    def __init__(
+        self,
+        cache: Optional[PlanCache] = None,
+        rules_path: Optional[Path] = None,
+        backend: Optional[PlannerBackend] = None,
+    ) -> None:
+        rules = load_rules(rules_path)
+        self.keyword = KeywordBackend(rules)
+        self.backend = backend or create_backend(PLANNER_CONFIG["backend"], rules)
+        self.version = f"{PLANNER_VERSION}-{self.backend.version}"
+        self.cache = cache
 
     def create_plan(self, instruction: str) -> Plan:
+        """根据自然语言生成计划；配置了缓存时，相同指令只规划一次"""
+        if self.cache is None:
+            return self._derive_plan(instruction)
+        cached = self.cache.get(instruction, self.version)
+        if cached is not None:
+            # 每次返回新对象，避免调用方修改影响缓存内容
+            plan = Plan.from_dict(cached)
+            plan.instruction = instruction
+            return plan
+        plan = self._derive_plan(instruction)
+        self._store(plan)
+        return plan
+
+    def create_plans(self, instructions: List[str]) -> List[Plan]:
         """
-        根据自然语言生成计划。
-        为保证可运行性，此处使用关键词映射生成确定性计划，可根据需要接入 LLM。
+        批量规划：缓存命中的直接返回，其余指令并发请求后端（并发数为连接池大小），
+        结果顺序与传入顺序一致
         """
-        normalized = instruction.lower()
-        steps: List[PlanStep] = []
-
-        # 登录相关
-        if "登录" in instruction or "login" in normalized:
-            steps.extend(
-                [
-                    PlanStep(
-                        id=1,
-                        action="goto",
-                        target="https://iam.opencsg.com/login",
-                        expect="登录页加载成功",
-                        note="打开统一认证登录页",
-                    ),
-                    PlanStep(
-                        id=2,
-                        action="fill",
-                        target="input[name='username'], #username, input[type='email']",
-                        value="{{TEST_USERNAME}}",
-                        expect="用户名输入成功",
-                        note="使用环境变量 TEST_USERNAME",
-                    ),
-                    PlanStep(
-                        id=3,
-                        action="fill",
-                        target="input[name='password'], #password, input[type='password']",
-                        value="{{TEST_PASSWORD}}",
-                        expect="密码输入成功",
-                        note="使用环境变量 TEST_PASSWORD",
-                    ),
-                    PlanStep(
-                        id=4,
-                        action="click",
-                        target="button[type='submit'], button:has-text('登录'), .login-btn",
-                        expect="提交登录表单",
-                        note="点击登录按钮",
-                    ),
-                    PlanStep(
-                        id=5,
-                        action="wait_for_text",
-                        target="AgentHub",
-                        expect="登录后看到 AgentHub 关键字",
-                        note="验证跳转到 AgentHub",
-                    ),
-                    PlanStep(
-                        id=6,
-                        action="screenshot",
-                        target="after_login",
-                        expect="登录结果截图",
-                        note="报告中展示",
-                    ),
-                ]
-            )
-
-        # 知识库/上传 PDF 场景
-        elif "知识库" in instruction or "pdf" in normalized or "上传" in instruction:
-            steps.extend(
-                [
-                    PlanStep(
-                        id=1,
-                        action="goto",
-                        target=TARGET_URL,
-                        expect="AgentHub 首页加载成功",
-                        note="进入 AgentHub",
-                    ),
-                    PlanStep(
-                        id=2,
-                        action="click",
-                        target="text=创建知识库, button:has-text('创建'), .create-btn",
-                        expect="打开创建知识库弹窗或页面",
-                        note="入口按钮文案可能因版本而异",
-                    ),
-                    PlanStep(
-                        id=3,
-                        action="fill",
-                        target="input[name='name'], input[placeholder*='名称'], input[placeholder*='Name']",
-                        value="AutoKB Demo",
-                        expect="输入知识库名称",
-                        note="示例名称，可调整",
-                    ),
-                    PlanStep(
-                        id=4,
-                        action="upload",
-                        target="input[type='file']",
-                        value="sample.pdf",
-                        expect="PDF 上传成功或显示进度完成",
-                        note="需要在项目根目录准备 sample.pdf",
-                    ),
-                    PlanStep(
-                        id=5,
-                        action="click",
-                        target="button:has-text('保存'), button:has-text('创建'), .submit-btn",
-                        expect="提交创建知识库",
-                        note="提交后等待状态变化",
-                    ),
-                    PlanStep(
-                        id=6,
-                        action="wait_for_text",
-                        target="AutoKB Demo",
-                        expect="列表中出现新建的知识库",
-                        note="验证创建成功",
-                    ),
-                    PlanStep(
-                        id=7,
-                        action="screenshot",
-                        target="kb_created",
-                        expect="保存创建结果截图",
-                        note="报告展示",
-                    ),
-                ]
-            )
-
-        # 默认回退计划：访问首页并检查主内容
-        else:
-            steps.extend(self.default_steps)
-
-        return Plan(instruction=instruction, steps=steps)
+        plans: Dict[str, Plan] = {}
+        pending: List[str] = []
+        for instruction in dict.fromkeys(instructions):
+            cached = self.cache.get(instruction, self.version) if self.cache else None
+            if cached is not None:
+                plans[instruction] = Plan.from_dict(cached)
+                plans[instruction].instruction = instruction
+            else:
+                pending.append(instruction)
+        if pending:
+            with ThreadPoolExecutor(max_workers=PLANNER_CONFIG["llm_pool_size"]) as executor:
+                for instruction, plan in zip(pending, executor.map(self._derive_plan, pending)):
+                    plans[instruction] = plan
+                    self._store(plan)
+        return [Plan.from_dict(plans[i].to_dict()) for i in instructions]
+
+    def _store(self, plan: Plan):
+        # 回退生成的计划不写入缓存，后端恢复后重新规划
+        if self.cache is not None and plan.planner == self.backend.name:
+            self.cache.put(plan.instruction, self.version, plan.to_dict())
+
+    def _derive_plan(self, instruction: str) -> Plan:
+        """调用规划后端；LLM 后端超时、不可用或输出不合规时回退到关键词规则"""
+        backend = self.backend
+        try:
+            data = backend.plan(instruction)
+        except PlannerBackendError:
+            if isinstance(backend, KeywordBackend):
+                raise
+            backend = self.keyword
+            data = backend.plan(instruction)
+        return Plan.from_dict(dict(data, planner=backend.name))
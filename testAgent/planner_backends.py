@@ -0,0 +1,275 @@
+"""
+规划后端：关键词规则后端与 HTTP LLM 后端
+"""
+import codecs
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Protocol
+from urllib.parse import urlparse
+from testAgent.config import PLANNER_CONFIG
+from testAgent.actor import ACTIONS
+from testAgent.intent_rules import IntentRules
+
+# LLM 返回的步骤允许的字段及其类型
+_STEP_FIELDS = {
+    "id": int,
+    "action": str,
+    "target": str,
+    "value": str,
+    "expect": str,
+    "note": str,
+    "wait_until": str,
+    "depends_on": list,
+    "budgets": dict,
+    "assertions": dict,
+    "capture": dict,
+}
+_META_FIELDS = {"requires_auth": bool, "routing_profile": str}
+
+
+class PlannerBackendError(Exception):
+    """规划后端不可用或返回无效结果，Planner 会回退到关键词后端"""
+
+
+class PlannerTimeout(PlannerBackendError):
+    """规划请求超时"""
+
+
+class PlanSchemaError(PlannerBackendError):
+    """后端返回的计划不符合 PlanStep 结构"""
+
+
+class PlannerBackend(Protocol):
+    """规划后端协议：name 标识实际生成计划的后端，version 参与计划缓存的键"""
+
+    name: str
+    version: str
+
+    def plan(self, instruction: str) -> Dict[str, Any]:
+        """返回可直接传给 Plan.from_dict 的计划字典"""
+        ...
+
+
+class KeywordBackend:
+    """基于意图规则关键词索引的确定性后端"""
+
+    name = "keyword"
+
+    def __init__(self, rules: IntentRules):
+        self.rules = rules
+        self.version = f"keyword-{rules.digest}"
+
+    def plan(self, instruction: str) -> Dict[str, Any]:
+        return self.rules.compose(instruction)
+
+
+def check_step(data: Any, default_id: int) -> Dict[str, Any]:
+    """校验单个步骤并补全 id，不符合 PlanStep 结构时抛出 PlanSchemaError"""
+    if not isinstance(data, dict):
+        raise PlanSchemaError(f"步骤必须是对象: {data!r}")
+    unknown = set(data) - set(_STEP_FIELDS)
+    if unknown:
+        raise PlanSchemaError(f"步骤包含未知字段: {', '.join(sorted(unknown))}")
+    step = {"id": default_id, **data}
+    for name, kind in _STEP_FIELDS.items():
+        if step.get(name) is not None and not isinstance(step[name], kind):
+            raise PlanSchemaError(f"步骤 {step['id']} 的 {name} 应为 {kind.__name__}")
+    if step.get("action") not in ACTIONS:
+        raise PlanSchemaError(f"步骤 {step['id']} 的动作未知: {step.get('action')}")
+    if not all(isinstance(dep, int) for dep in step.get("depends_on") or []):
+        raise PlanSchemaError(f"步骤 {step['id']} 的 depends_on 应为整数列表")
+    return step
+
+
+def check_plan(instruction: str, meta: Dict[str, Any], steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """校验整体结构：至少一个步骤、id 唯一、依赖只指向之前的步骤"""
+    if not steps:
+        raise PlanSchemaError("计划没有任何步骤")
+    seen: set = set()
+    for step in steps:
+        if step["id"] in seen:
+            raise PlanSchemaError(f"步骤 id 重复: {step['id']}")
+        missing = [dep for dep in step.get("depends_on") or [] if dep not in seen]
+        if missing:
+            raise PlanSchemaError(f"步骤 {step['id']} 依赖了不存在或靠后的步骤: {missing}")
+        seen.add(step["id"])
+    for name, kind in _META_FIELDS.items():
+        if name in meta and not isinstance(meta[name], kind):
+            raise PlanSchemaError(f"计划的 {name} 应为 {kind.__name__}")
+    return {
+        "instruction": instruction,
+        "steps": steps,
+        "requires_auth": meta.get("requires_auth", False),
+        "routing_profile": meta.get("routing_profile", ""),
+    }
+
+
+class StepStreamParser:
+    """
+    增量解析流式响应中的 JSON 对象，兼容 NDJSON 与 JSON 数组两种格式。
+    每收到一段数据就解析出其中完整的对象，不必等待整个响应结束。
+    """
+
+    _SEPARATORS = " \t\r\n,[]"
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        self._buffer += self._text.decode(chunk)
+        objects: List[Dict[str, Any]] = []
+        while True:
+            self._buffer = self._buffer.lstrip(self._SEPARATORS)
+            if not self._buffer:
+                break
+            try:
+                obj, end = self._decoder.raw_decode(self._buffer)
+            except json.JSONDecodeError:
+                break  # 对象尚未完整，等待后续数据
+            objects.append(obj)
+            self._buffer = self._buffer[end:]
+        return objects
+
+    def close(self):
+        if self._buffer.strip(self._SEPARATORS):
+            raise PlanSchemaError("响应在 JSON 对象中途结束或格式无效")
+
+
+class ConnectionPool:
+    """
+    线程安全的 HTTP 长连接池：空闲连接复用，信号量限制同时进行的请求数
+    """
+
+    def __init__(self, url: str, size: int, timeout: float):
+        parsed = urlparse(url)
+        self.https = parsed.scheme == "https"
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    @contextmanager
+    def connection(self, fresh: bool = False) -> Iterator[http.client.HTTPConnection]:
+        """借出连接；调用方读完响应后连接回到池中，出错的连接直接关闭"""
+        with self._slots:
+            conn = None
+            if not fresh:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    pass
+            conn = conn or self._connect()
+            try:
+                yield conn
+            except BaseException:
+                conn.close()
+                raise
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class HttpLLMBackend:
+    """
+    HTTP LLM 后端
+    - POST {"instruction", "model", "actions"}，响应为流式的 JSON 对象（NDJSON 或数组）
+    - {"meta": {...}} 对象携带 requires_auth / routing_profile，其余对象为步骤
+    - 步骤边到达边校验，整体超过 timeout 即放弃
+    """
+
+    name = "llm"
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+    ):
+        self.url = url or PLANNER_CONFIG["llm_url"]
+        self.model = model or PLANNER_CONFIG["llm_model"]
+        self.timeout = timeout or PLANNER_CONFIG["llm_timeout"]
+        self.path = urlparse(self.url).path or "/"
+        self.version = f"llm-{self.model or 'default'}"
+        self.pool = ConnectionPool(
+            self.url, pool_size or PLANNER_CONFIG["llm_pool_size"], PLANNER_CONFIG["llm_connect_timeout"]
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json", "Accept": "application/x-ndjson"}
+        api_key = os.getenv(PLANNER_CONFIG["llm_api_key_env"])
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
+        return headers
+
+    def plan(self, instruction: str) -> Dict[str, Any]:
+        deadline = time.monotonic() + self.timeout
+        body = json.dumps(
+            {"instruction": instruction, "model": self.model, "actions": list(ACTIONS)},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        try:
+            try:
+                return self._request(instruction, body, deadline, fresh=False)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # 复用的空闲连接可能已被服务端关闭，换新连接重试一次
+                return self._request(instruction, body, deadline, fresh=True)
+        except TimeoutError:
+            raise PlannerTimeout(f"规划请求超过 {self.timeout} 秒")
+        except (OSError, http.client.HTTPException) as exc:
+            raise PlannerBackendError(f"规划服务不可用: {exc}")
+
+    def _request(self, instruction: str, body: bytes, deadline: float, fresh: bool) -> Dict[str, Any]:
+        with self.pool.connection(fresh=fresh) as conn:
+            conn.request("POST", self.path, body=body, headers=self._headers())
+            response = conn.getresponse()
+            if response.status != 200:
+                response.read()
+                raise PlannerBackendError(f"规划服务返回 {response.status}")
+            parser = StepStreamParser()
+            meta: Dict[str, Any] = {}
+            steps: List[Dict[str, Any]] = []
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PlannerTimeout(f"规划请求超过 {self.timeout} 秒")
+                if conn.sock:  # 服务端声明 Connection: close 时连接已脱离，沿用连接超时
+                    conn.sock.settimeout(remaining)
+                chunk = response.read1(8192)
+                if not chunk:
+                    break
+                for obj in parser.feed(chunk):
+                    if isinstance(obj, dict) and "meta" in obj:
+                        meta.update(obj["meta"])
+                    else:
+                        steps.append(check_step(obj, len(steps) + 1))
+            parser.close()
+        return check_plan(instruction, meta, steps)
+
+    def close(self):
+        self.pool.close()
+
+
+def create_backend(name: str, rules: IntentRules) -> PlannerBackend:
+    if name == "keyword":
+        return KeywordBackend(rules)
+    if name == "llm":
+        return HttpLLMBackend()
+    raise ValueError(f"未知的规划后端: {name}")
@@ -0,0 +1,81 @@
+"""
+PrefixTrie - 按步骤前缀合并一批计划，公共前缀只执行一次
+"""
+import json
+from typing import Dict, Any, List, Optional
+
+# 只影响展示、不影响执行的字段，不参与步骤比较
+_DISPLAY_FIELDS = ("note", "expect")
+# 只读取页面的动作：上一次 goto 之后只执行过这些动作时，重新导航到当前 URL 即可还原页面状态
+_READ_ONLY = ("wait_for_text", "wait_for_selector", "screenshot")
+
+
+def step_key(step: Dict[str, Any]) -> str:
+    """
+    步骤的执行特征。id 与 depends_on 也参与比较，
+    保证共享前缀中的失败对每个计划产生相同的阻断效果
+    """
+    return json.dumps(
+        {k: v for k, v in step.items() if k not in _DISPLAY_FIELDS},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+
+
+class PrefixNode:
+    """前缀树节点：step 为代表步骤；plans 为在此结束的计划；members 为经过此节点的计划"""
+
+    def __init__(self, step: Optional[Dict[str, Any]] = None):
+        self.step = step
+        self.children: Dict[str, "PrefixNode"] = {}
+        self.plans: List[Any] = []
+        self.members: List[Any] = []
+
+    def count(self) -> int:
+        """子树中的步骤节点数，即实际执行的步骤数"""
+        return sum(1 + child.count() for child in self.children.values())
+
+
+def stable_segments(steps: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    将步骤切分为若干段，每段（最后一段除外）都结束在导航稳定点：
+    自上一次 goto 以来只有只读步骤。分叉时新上下文只恢复 storage state 与 URL，
+    在稳定点之外分叉会丢失弹窗、已填写的输入等页面内状态
+    """
+    segments: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    stable = True
+    for step in steps:
+        current.append(step)
+        action = step.get("action")
+        if action == "goto":
+            stable = True
+        elif action not in _READ_ONLY:
+            stable = False
+        if stable:
+            segments.append(current)
+            current = []
+    if current:
+        segments.append(current)
+    return segments
+
+
+def build_prefix_trie(step_lists: Dict[Any, List[Dict[str, Any]]]) -> PrefixNode:
+    """
+    按插入顺序构建前缀树，step_lists 的键为计划标识。
+    以稳定段为单位合并：段首节点的键包含整段步骤，只有整段相同的计划才共享，
+    因此分叉只会出现在稳定点
+    """
+    root = PrefixNode()
+    for plan_key, steps in step_lists.items():
+        node = root
+        for segment in stable_segments(steps):
+            keys = [step_key(step) for step in segment]
+            keys[0] = json.dumps(keys, ensure_ascii=False)
+            for key, step in zip(keys, segment):
+                if key not in node.children:
+                    node.children[key] = PrefixNode(step)
+                node = node.children[key]
+                node.members.append(plan_key)
+        node.plans.append(plan_key)
+    return root
@@ -124,6 +124,10 @@ class ReportGenerator:
             background: #fff3cd;
             color: #856404;
         }
+        .status-badge.blocked {
+            background: #e2e3e5;
+            color: #383d41;
+        }
         .scenario-body {
             padding: 20px;
         }
@@ -151,6 +155,9 @@ class ReportGenerator:
         .step.running {
             border-left-color: #ffc107;
         }
+        .step.blocked {
+            border-left-color: #6c757d;
+        }
         .step-header {
             display: flex;
             justify-content: space-between;
@@ -187,6 +194,24 @@ class ReportGenerator:
             height: auto;
             display: block;
         }
+        .metrics-table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 15px;
+            font-size: 0.9em;
+        }
+        .metrics-table th, .metrics-table td {
+            border: 1px solid #ddd;
+            padding: 6px 8px;
+            text-align: right;
+        }
+        .metrics-table th:first-child, .metrics-table td:first-child {
+            text-align: left;
+        }
+        .metrics-table td.over-budget {
+            color: #dc3545;
+            font-weight: bold;
+        }
         .footer {
             margin-top: 40px;
             padding-top: 20px;
@@ -247,11 +272,89 @@ class ReportGenerator:
                             {% if step.timestamp %}
                             <strong>时间:</strong> {{ step.timestamp }}<br>
                             {% endif %}
+                            {% if step.screenshot_hash %}
+                            <strong>截图:</strong> <a href="{{ step.screenshot }}">{{ step.screenshot_hash }}</a><br>
+                            {% endif %}
+                            {% if step.trace %}
+                            <strong>Trace:</strong> <a href="{{ step.trace }}">{{ step.trace }}</a>（playwright show-trace 打开）<br>
+                            {% endif %}
+                            {% if step.trace_before %}
+                            <strong>前序 Trace:</strong> <a href="{{ step.trace_before }}">{{ step.trace_before }}</a><br>
+                            {% endif %}
+                            {% if step.attempts and step.attempts > 1 %}
+                            <strong>重试:</strong> 共尝试 {{ step.attempts }} 次，重试耗时 {{ "%.2f"|format(step.retry_time) }}s<br>
+                            {% endif %}
+                            {% if step.wait_until %}
+                            <strong>就绪策略:</strong> {{ step.wait_until }}{% if step.wait_saved %}（较 networkidle 约节省 {{ "%.2f"|format(step.wait_saved) }}s）{% endif %}<br>
+                            {% endif %}
                         </div>
                     </div>
                     {% endfor %}
                 </div>
                 
+                {% set metric_steps = scenario.steps|selectattr("metrics")|list %}
+                {% if metric_steps %}
+                <table class="metrics-table">
+                    <tr>
+                        <th>页面性能</th><th>TTFB</th><th>DCL</th><th>Load</th><th>FCP</th><th>LCP</th><th>CLS</th><th>TBT</th><th>传输</th><th>请求数</th>
+                    </tr>
+                    {% for step in metric_steps %}
+                    <tr>
+                        <td>{{ step.name }}</td>
+                        {% for key in ["ttfb", "dom_content_loaded", "load", "fcp", "lcp", "cls", "tbt", "transfer_size", "requests"] %}
+                        {% set value = step.metrics[key] %}
+                        {% set limit = (step.budgets or {}).get(key) %}
+                        <td class="{{ 'over-budget' if value is not none and limit is not none and value > limit }}"{% if limit is not none %} title="预算 {{ limit }}"{% endif %}>
+                            {%- if value is none %}-{% elif key == "transfer_size" %}{{ "%.1f"|format(value / 1024) }} KB{% elif key in ["cls", "requests"] %}{{ value }}{% else %}{{ value }} ms{% endif -%}
+                        </td>
+                        {% endfor %}
+                    </tr>
+                    {% endfor %}
+                </table>
+                {% endif %}
+                
+                {% if scenario.routing and scenario.routing.blocked_requests %}
+                <div class="step-details">
+                    <strong>请求路由:</strong> {{ scenario.routing.profile }}，拦截 {{ scenario.routing.blocked_requests }} 个请求，约节省 {{ "%.1f"|format(scenario.routing.blocked_bytes / 1024) }} KB
+                </div>
+                {% endif %}
+                
+                {% if scenario.phase_totals %}
+                <div class="step-details">
+                    <strong>阶段耗时:</strong>
+                    {% for phase, seconds in scenario.phase_totals.items() if seconds %}{{ phase }} {{ "%.2f"|format(seconds) }}s{% if not loop.last %} · {% endif %}{% endfor %}
+                    {% if scenario.timing_trace %}（<a href="{{ scenario.timing_trace }}">trace events</a>）{% endif %}
+                </div>
+                {% endif %}
+                
+                {% if scenario.optimization and (scenario.optimization.removed or scenario.optimization.decoupled) %}
+                <div class="step-details">
+                    <strong>计划优化:</strong> 移除 {{ scenario.optimization.removed|length }} 步，预计节省 {{ "%.2f"|format(scenario.optimization.estimated_saved) }}s
+                    {% if scenario.optimization.decoupled %}，截图步骤 {{ scenario.optimization.decoupled|join(", ") }} 失败不再阻断后续步骤（不节省时间）{% endif %}
+                    {% for removed in scenario.optimization.removed %}
+                    <br>· 步骤 {{ removed.id }}（{{ removed.action }} {{ removed.target }}）：{{ removed.reason }}
+                    {% endfor %}
+                </div>
+                {% endif %}
+                
+                {% if scenario.selector_cache and (scenario.selector_cache.hits or scenario.selector_cache.misses) %}
+                <div class="step-details">
+                    <strong>选择器缓存:</strong> 命中 {{ scenario.selector_cache.hits }} 次，未命中 {{ scenario.selector_cache.misses }} 次，淘汰 {{ scenario.selector_cache.evictions }} 条
+                </div>
+                {% endif %}
+                
+                {% if scenario.retries %}
+                <div class="step-details">
+                    <strong>重试开销:</strong> {{ scenario.retries }} 次重试，耗时 {{ "%.2f"|format(scenario.retry_time) }}s
+                </div>
+                {% endif %}
+                
+                {% if scenario.wait_saved %}
+                <div class="step-details">
+                    <strong>等待节省:</strong> 较 networkidle 约 {{ "%.2f"|format(scenario.wait_saved) }}s
+                </div>
+                {% endif %}
+                
                 {% if scenario.error_message %}
                 <div class="error-message">
                     <strong>错误信息:</strong> {{ scenario.error_message }}
@@ -261,7 +364,8 @@ class ReportGenerator:
                 {% if scenario.screenshots %}
                 <div class="screenshots">
                     <h4>截图:</h4>
-                    {% for screenshot in scenario.screenshots %}
+                    {# 内容寻址存储中相同哈希的截图只展示一次 #}
+                    {% for screenshot in scenario.screenshots|unique %}
                     <div class="screenshot">
                         <img src="{{ screenshot }}" alt="Screenshot">
                     </div>
@@ -324,6 +428,38 @@ class ReportGenerator:
             
             if scenario['error_message']:
                 lines.append(f"错误: {scenario['error_message']}")
+            if scenario.get('phase_totals'):
+                phases = "，".join(f"{k} {v:.2f}s" for k, v in scenario['phase_totals'].items() if v)
+                lines.append(f"阶段耗时: {phases}")
+            if scenario.get('timing_trace'):
+                lines.append(f"阶段 trace: {scenario['timing_trace']}")
+            optimization = scenario.get('optimization')
+            if optimization and (optimization['removed'] or optimization['decoupled']):
+                lines.append(
+                    f"计划优化: 移除 {len(optimization['removed'])} 步，预计节省 {optimization['estimated_saved']:.2f} 秒"
+                )
+                for removed in optimization['removed']:
+                    lines.append(f"  - 步骤 {removed['id']}（{removed['action']} {removed['target']}）：{removed['reason']}")
+                if optimization['decoupled']:
+                    lines.append(
+                        f"  - 截图步骤 {', '.join(map(str, optimization['decoupled']))} 失败不再阻断后续步骤（不节省时间）"
+                    )
+            selector_stats = scenario.get('selector_cache')
+            if selector_stats and (selector_stats['hits'] or selector_stats['misses']):
+                lines.append(
+                    f"选择器缓存: 命中 {selector_stats['hits']} 次，未命中 {selector_stats['misses']} 次，"
+                    f"淘汰 {selector_stats['evictions']} 条"
+                )
+            if scenario.get('retries'):
+                lines.append(f"重试开销: {scenario['retries']} 次重试，耗时 {scenario['retry_time']:.2f} 秒")
+            routing = scenario.get('routing')
+            if routing and routing.get('blocked_requests'):
+                lines.append(
+                    f"请求路由: {routing['profile']}，拦截 {routing['blocked_requests']} 个请求，"
+                    f"约节省 {routing['blocked_bytes'] / 1024:.1f} KB"
+                )
+            if scenario.get('wait_saved'):
+                lines.append(f"等待节省: 较 networkidle 约 {scenario['wait_saved']:.2f} 秒")
             
             lines.append("步骤:")
             for i, step in enumerate(scenario['steps'], 1):
@@ -331,10 +467,23 @@ class ReportGenerator:
                 lines.append(f"     操作: {step['action']}")
                 if step.get('message'):
                     lines.append(f"     结果: {step['message']}")
+                if step.get('screenshot_hash'):
+                    lines.append(f"     截图: {step['screenshot_hash']}")
+                if step.get('trace'):
+                    lines.append(f"     Trace: {step['trace']}")
+                if step.get('trace_before'):
+                    lines.append(f"     前序 Trace: {step['trace_before']}")
+                if step.get('attempts', 1) > 1:
+                    lines.append(f"     重试: 共尝试 {step['attempts']} 次，重试耗时 {step.get('retry_time', 0):.2f} 秒")
+                if step.get('wait_until'):
+                    lines.append(f"     就绪策略: {step['wait_until']}，约节省 {step.get('wait_saved') or 0:.2f} 秒")
+                if step.get('metrics'):
+                    metrics = "，".join(f"{k}={v}" for k, v in step['metrics'].items() if v is not None)
+                    lines.append(f"     页面性能: {metrics}")
             
             if scenario['screenshots']:
                 lines.append("截图:")
-                for screenshot in scenario['screenshots']:
+                for screenshot in dict.fromkeys(scenario['screenshots']):
                     lines.append(f"  - {screenshot}")
             
             lines.append("-" * 80)
@@ -343,3 +492,89 @@ class ReportGenerator:
         output_path.write_text(content, encoding="utf-8")
         return str(output_path)
 
+
+    def generate_load_report(self, load: Dict[str, Any], output_file: Optional[str] = None) -> str:
+        """生成压测结果的文本报告：每步分位数、吞吐量与错误率"""
+        if output_file is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = f"load_report_{timestamp}.txt"
+        
+        output_path = self.reports_dir / output_file
+        
+        iteration = load['iteration']
+        lines = []
+        lines.append("=" * 80)
+        lines.append("压测报告")
+        lines.append("=" * 80)
+        lines.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        lines.append(f"计划: {load['instruction']}")
+        lines.append(f"迭代: {load['iterations']} 次，并发 {load['concurrency']}，爬坡 {load['ramp_up']:.1f} 秒")
+        lines.append(f"总时长: {load['duration']:.2f} 秒")
+        lines.append(f"吞吐量: {load['throughput']:.3f} 次/秒")
+        lines.append(f"错误率: {load['error_rate']:.2%}（失败 {load['failed']} 次）")
+        optimization = load.get('optimization')
+        if optimization and optimization['removed']:
+            removed_ids = ", ".join(str(r['id']) for r in optimization['removed'])
+            lines.append(f"计划优化: 移除步骤 {removed_ids}，每次迭代预计节省 {optimization['estimated_saved']:.2f} 秒")
+        lines.append(
+            f"单次迭代: p50 {iteration['p50']:.3f}s  p95 {iteration['p95']:.3f}s  "
+            f"p99 {iteration['p99']:.3f}s  max {iteration['max']:.3f}s"
+        )
+        lines.append("")
+        lines.append(f"{'步骤':<24}{'次数':>6}{'失败':>6}{'阻断':>6}{'p50(s)':>10}{'p95(s)':>10}{'p99(s)':>10}{'错误率':>10}")
+        lines.append("-" * 80)
+        for step in load['steps']:
+            name = f"{step['id']}. {step['action']}"
+            lines.append(
+                f"{name:<24}{step['count']:>6}{step['failed']:>6}{step['blocked']:>6}"
+                f"{step['p50']:>10.3f}{step['p95']:>10.3f}{step['p99']:>10.3f}{step['error_rate']:>10.2%}"
+            )
+        if load['top_errors']:
+            lines.append("")
+            lines.append("主要错误:")
+            for message, count in load['top_errors']:
+                lines.append(f"  {count} × {message}")
+        
+        content = "\n".join(lines)
+        output_path.write_text(content, encoding="utf-8")
+        return str(output_path)
+
+    def generate_junit_report(self, summary: Dict[str, Any], output_file: Optional[str] = None) -> str:
+        """生成 JUnit XML 报告，供 CI 展示；每个场景对应一个 testcase"""
+        import xml.etree.ElementTree as ET
+
+        if output_file is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = f"test_report_{timestamp}.xml"
+        
+        output_path = self.reports_dir / output_file
+        
+        suite = ET.Element(
+            "testsuite",
+            name="testAgent",
+            tests=str(summary['total']),
+            failures=str(summary['failed']),
+            time=f"{summary['duration']:.3f}",
+            timestamp=datetime.now().isoformat(timespec="seconds"),
+        )
+        for scenario in summary['scenarios']:
+            case = ET.SubElement(
+                suite,
+                "testcase",
+                classname=scenario.get('source') or "testAgent",
+                name=scenario['name'],
+                time=f"{scenario.get('duration', 0):.3f}",
+            )
+            if scenario['status'] == "failed":
+                failure = ET.SubElement(case, "failure", message=scenario.get('error_message') or "failed")
+                failure.text = "\n".join(
+                    f"[{step['status']}] {step['name']}: {step.get('message') or ''}"
+                    for step in scenario['steps']
+                    if step['status'] in ("failed", "blocked")
+                )
+            ET.SubElement(case, "system-out").text = "\n".join(
+                f"[{step['status']}] {step['name']} ({step.get('action')})" for step in scenario['steps']
+            )
+        ET.indent(suite)
+        ET.ElementTree(suite).write(output_path, encoding="utf-8", xml_declaration=True)
+        return str(output_path)
@@ -1,11 +1,32 @@
 """
 Reporter - 分析者，汇总执行结果并生成报告
 """
+import math
+from collections import Counter
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from testAgent.report_generator import ReportGenerator
 
 
+LOAD_PERCENTILES = (50, 95, 99)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近秩法分位数，values 为空时返回 0"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_stats(durations: List[float]) -> Dict[str, float]:
+    stats = {f"p{q}": round(percentile(durations, q), 3) for q in LOAD_PERCENTILES}
+    stats["mean"] = round(sum(durations) / len(durations), 3) if durations else 0.0
+    stats["max"] = round(max(durations), 3) if durations else 0.0
+    return stats
+
+
 class Reporter:
     """
     Reporter（分析者）
@@ -47,11 +68,24 @@ class Reporter:
                     "message": step.get("message"),
                     "timestamp": step.get("timestamp"),
                     "screenshot": step.get("screenshot"),
+                    "screenshot_hash": step.get("screenshot_hash"),
+                    "trace": step.get("trace"),
+                    "trace_before": step.get("trace_before"),
+                    "wait_until": step.get("wait_until"),
+                    "wait_saved": step.get("wait_saved"),
+                    "metrics": step.get("metrics"),
+                    "budgets": step.get("budgets"),
+                    "attempts": step.get("attempts", 1),
+                    "retry_time": step.get("retry_time", 0),
                 }
                 for step in step_results
             ],
+            "retries": sum(step.get("attempts", 1) - 1 for step in step_results),
+            "retry_time": round(sum(step.get("retry_time", 0) for step in step_results), 3),
+            "wait_saved": round(sum(step.get("wait_saved") or 0 for step in step_results), 3),
             "error_message": error_message,
             "screenshots": [s for s in (step.get("screenshot") for step in step_results) if s],
+            "traces": [t for t in (step.get("trace") for step in step_results) if t],
         }
         return scenario
 
@@ -67,6 +101,73 @@ class Reporter:
             "scenarios": scenarios,
         }
 
+    def merge_summaries(self, summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """合并多个分片（进程）的 build_summary 输出"""
+        scenarios: List[Dict[str, Any]] = []
+        for summary in summaries:
+            scenarios.extend(summary.get("scenarios", []))
+        return self.build_summary(scenarios)
+
+    def build_load_result(
+        self,
+        plan: Dict[str, Any],
+        runs: List[Dict[str, Any]],
+        start_time: datetime,
+        end_time: datetime,
+        concurrency: int,
+        ramp_up: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        汇总压测结果：runs 中每项为一次迭代 {"duration", "steps"}，
+        迭代本身抛出异常（如上下文创建失败）时另有 "error"，计为失败迭代。
+        分位数只统计实际执行的步骤，被阻断的步骤计入 blocked。
+        """
+        elapsed = (end_time - start_time).total_seconds()
+        failed_runs = [
+            run for run in runs
+            if run.get("error") or any(step["status"] in ("failed", "blocked") for step in run["steps"])
+        ]
+        errors: Counter = Counter(
+            step.get("message")
+            for run in runs for step in run["steps"] if step["status"] == "failed"
+        )
+        errors.update(run["error"] for run in runs if run.get("error"))
+
+        steps: List[Dict[str, Any]] = []
+        for plan_step in plan.get("steps", []):
+            results = [
+                step for run in runs for step in run["steps"] if step.get("id") == plan_step.get("id")
+            ]
+            executed = [step for step in results if step["status"] != "blocked"]
+            failed = sum(1 for step in executed if step["status"] == "failed")
+            steps.append({
+                "id": plan_step.get("id"),
+                "name": plan_step.get("note") or f"Step {plan_step.get('id')}",
+                "action": plan_step.get("action"),
+                "count": len(executed),
+                "failed": failed,
+                "blocked": len(results) - len(executed),
+                "error_rate": round(failed / len(executed), 4) if executed else 0.0,
+                **_latency_stats([step.get("duration", 0) for step in executed]),
+            })
+
+        return {
+            "instruction": plan.get("instruction", ""),
+            "start_time": start_time.isoformat(),
+            "end_time": end_time.isoformat(),
+            "duration": elapsed,
+            "iterations": len(runs),
+            "concurrency": concurrency,
+            "ramp_up": ramp_up,
+            "failed": len(failed_runs),
+            "error_rate": round(len(failed_runs) / len(runs), 4) if runs else 0.0,
+            # 吞吐量：每秒完成的计划迭代数
+            "throughput": round(len(runs) / elapsed, 3) if elapsed else 0.0,
+            "iteration": _latency_stats([run["duration"] for run in runs]),
+            "steps": steps,
+            "top_errors": errors.most_common(5),
+        }
+
     def generate_reports(self, summary: Dict[str, Any]) -> Dict[str, str]:
         html_path = self.generator.generate_html_report(summary)
         txt_path = self.generator.generate_text_report(summary)
@@ -0,0 +1,98 @@
+"""
+RequestRouter - 请求路由，按配置拦截字体、图片、媒体和第三方统计等请求
+"""
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+from playwright.sync_api import BrowserContext, Route, Request, Response
+from testAgent.config import ROUTING_PROFILES, ROUTING_SIZE_ESTIMATES, TEST_CONFIG
+
+
+class RequestRouter:
+    """
+    请求路由
+    - 在创建上下文时通过 context.route 应用命名的路由配置
+    - 统计被拦截的请求数与估算节省的字节数
+    """
+
+    # 从放行的响应中学到的资源大小，进程内共享，用于估算被拦截请求的体积
+    known_sizes: Dict[str, int] = {}
+
+    def __init__(self, profile: str = ""):
+        self.profile = profile or TEST_CONFIG["routing_profile"]
+        if self.profile not in ROUTING_PROFILES:
+            raise ValueError(f"未知的路由配置: {self.profile}")
+        rules = ROUTING_PROFILES[self.profile]
+        self.allow_types: List[str] = rules.get("allow_types", [])
+        self.deny_types: List[str] = rules.get("deny_types", [])
+        self.allow_hosts: List[str] = rules.get("allow_hosts", [])
+        self.deny_hosts: List[str] = rules.get("deny_hosts", [])
+        self.blocked_requests = 0
+        self.blocked_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.allow_types or self.deny_types or self.allow_hosts or self.deny_hosts)
+
+    def apply(self, context: BrowserContext):
+        """为上下文安装路由；full 等空配置不安装，避免每个请求的拦截开销"""
+        if not self.enabled:
+            return
+        context.route("**/*", self._handle)
+        context.on("response", self._learn_size)
+
+    async def apply_async(self, context):
+        """异步 API 版本的 apply"""
+        if not self.enabled:
+            return
+
+        async def handle(route):
+            if self._record_if_blocked(route.request):
+                await route.abort()
+            else:
+                await route.fallback()
+
+        await context.route("**/*", handle)
+        context.on("response", self._learn_size)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        if resource_type in self.deny_types:
+            return True
+        if self.allow_types and resource_type not in self.allow_types:
+            return True
+        if any(self._host_matches(host, h) for h in self.deny_hosts):
+            return True
+        if self.allow_hosts and not any(self._host_matches(host, h) for h in self.allow_hosts):
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile,
+            "blocked_requests": self.blocked_requests,
+            "blocked_bytes": self.blocked_bytes,
+        }
+
+    def _handle(self, route: Route):
+        if self._record_if_blocked(route.request):
+            route.abort()
+        else:
+            route.fallback()
+
+    def _record_if_blocked(self, request: Request) -> bool:
+        if not self.should_block(request.resource_type, request.url):
+            return False
+        self.blocked_requests += 1
+        self.blocked_bytes += self.known_sizes.get(
+            request.url, ROUTING_SIZE_ESTIMATES.get(request.resource_type, 0)
+        )
+        return True
+
+    def _learn_size(self, response: Response):
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.known_sizes[response.url] = int(length)
+
+    @staticmethod
+    def _host_matches(host: str, pattern: str) -> bool:
+        return host == pattern or host.endswith("." + pattern)
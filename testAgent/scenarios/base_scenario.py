@@ -46,17 +46,13 @@ class TestScenario(ABC):
             self.steps[step_index]["timestamp"] = datetime.now().isoformat()
             self.steps[step_index]["message"] = message
     
-    def take_screenshot(self, page: Page, name: str) -> str:
-        """截图并保存"""
-        from pathlib import Path
-        from testAgent.config import SCREENSHOTS_DIR
+    def take_screenshot(self, page: Page, name: str, selector: str = "") -> str:
+        """截图并交给截图服务在后台保存，selector 可指定只截取某个元素"""
+        from testAgent.screenshot_service import get_screenshot_service
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{self.name}_{name}_{timestamp}.png"
-        filepath = SCREENSHOTS_DIR / filename
-        page.screenshot(path=str(filepath))
-        self.screenshots.append(str(filepath))
-        return str(filepath)
+        filepath = get_screenshot_service().capture(page, f"{self.name}_{name}", selector)
+        self.screenshots.append(filepath)
+        return filepath
     
     def get_duration(self) -> float:
         """获取测试执行时长（秒）"""
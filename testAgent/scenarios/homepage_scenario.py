@@ -4,10 +4,17 @@
 from testAgent.scenarios.base_scenario import TestScenario
 from playwright.sync_api import Page, BrowserContext, expect
 from testAgent.config import TARGET_URL
+from testAgent.actor import navigate
+from testAgent.web_metrics import collect_metrics, check_budgets, install_observers, settle_metrics
 
 
 class HomepageScenario(TestScenario):
     """首页功能测试场景"""
+
+    # 首页为 SPA，DOM 就绪时内容尚未渲染：等到主要内容或导航出现，无需等待网络空闲
+    wait_until = "selector:main, [role='main'], nav, [role='navigation']"
+    # 首页性能预算，如 {"lcp": 2500}；为空时只采集不判定
+    budgets = {}
     
     def __init__(self):
         super().__init__(
@@ -24,7 +31,18 @@ class HomepageScenario(TestScenario):
         try:
             # 步骤1: 访问首页
             self.record_step_result(0, "running")
-            page.goto(TARGET_URL, wait_until="networkidle")
+            if self.budgets:
+                install_observers(context)
+            navigate(page, TARGET_URL, self.wait_until)
+            if self.budgets:
+                # 就绪选择器通常早于 load 与 LCP，判定预算前等待指标稳定
+                settle_metrics(page)
+            self.steps[0]["metrics"] = collect_metrics(page)
+            self.steps[0]["budgets"] = self.budgets
+            violations = check_budgets(self.steps[0]["metrics"], self.budgets)
+            if violations:
+                self.record_step_result(0, "failed", "性能预算未通过: " + "；".join(violations))
+                return False
             self.record_step_result(0, "passed", "页面加载成功")
             self.take_screenshot(page, "homepage_loaded")
             
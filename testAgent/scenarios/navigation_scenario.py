@@ -4,10 +4,14 @@
 from testAgent.scenarios.base_scenario import TestScenario
 from playwright.sync_api import Page, BrowserContext, expect
 from testAgent.config import TARGET_URL
+from testAgent.actor import navigate
 
 
 class NavigationScenario(TestScenario):
     """导航功能测试场景"""
+
+    # 链接由页面脚本渲染，等待 load 事件后再收集
+    wait_until = "load"
     
     def __init__(self):
         super().__init__(
@@ -23,7 +27,7 @@ class NavigationScenario(TestScenario):
         try:
             # 步骤1: 访问首页
             self.record_step_result(0, "running")
-            page.goto(TARGET_URL, wait_until="networkidle")
+            navigate(page, TARGET_URL, self.wait_until)
             self.record_step_result(0, "passed", "页面加载成功")
             
             # 步骤2: 查找导航链接
@@ -47,7 +51,7 @@ class NavigationScenario(TestScenario):
                 test_link = internal_links[0]
                 href = test_link.get_attribute("href")
                 test_link.click()
-                page.wait_for_load_state("networkidle", timeout=10000)
+                page.wait_for_load_state(self.wait_until, timeout=10000)
                 self.record_step_result(2, "passed", f"成功点击链接: {href}")
             else:
                 self.record_step_result(2, "passed", "跳过链接测试（无可用链接）")
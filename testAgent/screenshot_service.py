@@ -0,0 +1,121 @@
+"""
+ScreenshotService - 异步、去重的截图管线
+"""
+import hashlib
+import io
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from testAgent.config import SCREENSHOT_CONFIG
+
+try:  # WebP 需要 Pillow 在后台转码，未安装时退回 PNG
+    from PIL import Image
+except ImportError:  # pragma: no cover - 可选依赖
+    Image = None
+
+
+class ScreenshotService:
+    """
+    截图服务
+    - 步骤线程只负责从浏览器取回字节并计算内容哈希
+    - 转码与写盘交给后台线程池
+    - 以内容哈希为文件名存储，字节相同的截图只写一次
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = dict(SCREENSHOT_CONFIG, **(config or {}))
+        self.store_dir = Path(self.config["dir"])
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        self.format = self.config["format"]
+        if self.format == "webp" and Image is None:
+            self.format = "png"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._known: set = set()
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    def capture_options(self) -> Dict[str, Any]:
+        """page.screenshot 的参数：JPEG 直接由浏览器按质量编码，WebP 先取 PNG 再后台转码"""
+        if self.format == "jpeg":
+            return {"type": "jpeg", "quality": self.config["quality"]}
+        return {"type": "png"}
+
+    def capture(self, page, name: str, selector: str = "") -> str:
+        """截取页面或指定元素，返回内容寻址的文件路径（写盘可能尚未完成）"""
+        if selector:
+            data = page.locator(selector).first.screenshot(**self.capture_options())
+        else:
+            data = page.screenshot(**self.capture_options())
+        return self.store(data, name)
+
+    def store(self, data: bytes, name: str) -> str:
+        """按内容哈希存储截图字节，重复内容直接返回已有路径"""
+        digest = hashlib.sha256(data).hexdigest()[:20]
+        ext = "jpg" if self.format == "jpeg" else self.format
+        path = self.store_dir / f"{digest}.{ext}"
+        with self._lock:
+            duplicate = digest in self._known or path.exists()
+            self._known.add(digest)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config["workers"], thread_name_prefix="screenshot"
+                )
+            if not duplicate:
+                self._pending.append(self._executor.submit(self._write, data, path))
+            self._pending.append(self._executor.submit(self._index, digest, name, duplicate))
+        return str(path)
+
+    def flush(self):
+        """等待所有后台写入完成，生成报告前调用"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+
+    def shutdown(self):
+        self.flush()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _write(self, data: bytes, path: Path):
+        if self.format == "webp":
+            Image.open(io.BytesIO(data)).save(path, "WEBP", quality=self.config["quality"])
+        else:
+            path.write_bytes(data)
+
+    def _index(self, digest: str, name: str, duplicate: bool):
+        """记录截图名称与哈希的对应关系，便于从报告追溯"""
+        entry = {
+            "hash": digest,
+            "name": name,
+            "duplicate": duplicate,
+            "timestamp": datetime.now().isoformat(),
+        }
+        with self._index_lock, (self.store_dir / "index.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def screenshot_hash(path: str) -> str:
+    """内容寻址截图的哈希即文件名主干；非截图库中的文件返回空字符串"""
+    if not path:
+        return ""
+    p = Path(path)
+    return p.stem if p.parent == Path(SCREENSHOT_CONFIG["dir"]) else ""
+
+
+_service: Optional[ScreenshotService] = None
+_service_lock = threading.Lock()
+
+
+def get_screenshot_service() -> ScreenshotService:
+    """进程内共享的截图服务"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ScreenshotService()
+        return _service
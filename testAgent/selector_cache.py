@@ -0,0 +1,100 @@
+"""
+SelectorCache - 多候选选择器的解析缓存
+"""
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+from testAgent.config import SELECTOR_CACHE_CONFIG
+from testAgent.atomic_file import write_text_atomic
+
+
+def split_alternatives(target: str) -> List[str]:
+    """按顶层逗号拆分候选选择器，忽略引号、括号内的逗号"""
+    parts: List[str] = []
+    depth = 0
+    quote = ""
+    current = ""
+    for ch in target:
+        if quote:
+            if ch == quote:
+                quote = ""
+        elif ch in "'\"":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += ch
+    parts.append(current.strip())
+    return [p for p in parts if p]
+
+
+def url_pattern(url: str) -> str:
+    """将 URL 归一化为 host + path，路径中的数字段替换为 *"""
+    parsed = urlparse(url)
+    path = re.sub(r"/\d+(?=/|$)", "/*", parsed.path) or "/"
+    return f"{parsed.hostname or ''}{path}"
+
+
+class SelectorCache:
+    """
+    选择器解析缓存
+    - 以 URL 模式 + 步骤 target 为键，记录实际命中的候选选择器
+    - 持久化到磁盘，后续执行优先尝试已命中的候选
+    - 页面渲染后其他候选命中、而缓存的候选不匹配时淘汰
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or SELECTOR_CACHE_CONFIG["path"])
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def key(url: str, target: str) -> str:
+        return f"{url_pattern(url)}|{target}"
+
+    def get(self, url: str, target: str) -> Optional[str]:
+        entry = self.entries.get(self.key(url, target))
+        return entry["selector"] if entry else None
+
+    def record(self, url: str, target: str, selector: str):
+        key = self.key(url, target)
+        entry = self.entries.get(key)
+        if entry and entry["selector"] == selector:
+            entry["hits"] += 1
+        else:
+            entry = {"selector": selector, "hits": 0}
+            self.entries[key] = entry
+        entry["last_used"] = time.time()
+        self.dirty = True
+
+    def evict(self, url: str, target: str):
+        if self.entries.pop(self.key(url, target), None) is not None:
+            self.dirty = True
+
+    def load(self):
+        if not self.path.exists():
+            return
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        if not self.dirty:
+            return
+        # 超出容量时淘汰最久未使用的条目
+        max_entries = SELECTOR_CACHE_CONFIG["max_entries"]
+        if len(self.entries) > max_entries:
+            ordered = sorted(self.entries.items(), key=lambda kv: kv[1].get("last_used", 0), reverse=True)
+            self.entries = dict(ordered[:max_entries])
+        write_text_atomic(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2))
+        self.dirty = False
@@ -0,0 +1,158 @@
+"""
+SessionCache - 登录态缓存，避免每个需要登录的计划都重新走一遍登录页
+"""
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from playwright.sync_api import Browser, BrowserContext, Response
+from playwright.async_api import Browser as AsyncBrowser
+from testAgent.config import BROWSER_CONFIG, LOGIN_CONFIG, SESSION_CONFIG
+from testAgent.atomic_file import write_text_atomic
+
+
+# storage_state 文件路径（启用缓存）或内存中的登录态（禁用缓存），均可直接传给 new_context
+StorageState = Union[str, Dict[str, Any]]
+
+
+class SessionUnavailableError(RuntimeError):
+    """计划需要登录，但无法获取登录态；reason 为 SessionCache.failure 给出的具体原因"""
+
+    def __init__(self, reason: str = ""):
+        super().__init__(f"计划需要登录，但无法获取登录态：{reason or '原因未知'}")
+
+
+def login_steps() -> List[Dict[str, Any]]:
+    """Planner 的登录计划（去掉截图步骤），同步与异步登录共用"""
+    from testAgent.planner import Planner
+
+    return [s.to_dict() for s in Planner().create_plan("登录").steps if s.action != "screenshot"]
+
+
+class SessionCache:
+    """
+    登录态缓存
+    - 通过 UI 登录一次，将 context.storage_state() 保存到磁盘
+    - 缓存超过 TTL 或 cookie 已过期时自动重新登录
+    - 执行过程中检测到 401 响应时使缓存失效，下次创建上下文时刷新
+    - SESSION_CONFIG["enabled"] 为 False 时仍会登录，但登录态只保存在内存中，不写入磁盘
+    - 无法获取登录态时，failure 记录原因（未配置账号或登录计划失败的步骤）
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: Optional[float] = None):
+        self.path = Path(path or SESSION_CONFIG["storage_state_path"])
+        self.ttl = ttl if ttl is not None else SESSION_CONFIG["ttl"]
+        self.unauthorized = False
+        self.failure = ""
+        self._state: Optional[Dict[str, Any]] = None
+
+    @property
+    def has_credentials(self) -> bool:
+        return bool(LOGIN_CONFIG["username"] and LOGIN_CONFIG["password"])
+
+    def is_valid(self) -> bool:
+        """缓存文件存在、未超过 TTL 且 cookie 均未过期"""
+        if not self.path.exists():
+            return False
+        if time.time() - self.path.stat().st_mtime > self.ttl:
+            return False
+        try:
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        now = time.time()
+        # expires 为 -1 表示会话 cookie，不参与过期判断
+        return not any(0 < c.get("expires", -1) < now for c in state.get("cookies", []))
+
+    def get(self, browser: Browser) -> Optional[StorageState]:
+        """返回可用的登录态；缓存无效时重新登录，无法登录时返回 None 并记录 failure"""
+        if not self._can_login():
+            return None
+        if self._needs_login():
+            self.unauthorized = False
+            if not self.login(browser):
+                return None
+        return self._current()
+
+    def login(self, browser: Browser) -> bool:
+        """使用 Planner 的登录计划完成登录，并保存登录态"""
+        from testAgent.actor import Actor
+
+        context = browser.new_context(viewport=BROWSER_CONFIG["viewport"])
+        try:
+            results = Actor(context.new_page(), context).execute_plan(login_steps())
+            if not self._login_succeeded(results):
+                return False
+            self._save(context.storage_state())
+            return True
+        finally:
+            context.close()
+
+    async def get_async(self, browser: AsyncBrowser) -> Optional[StorageState]:
+        """get 的异步版本，供 run_plans / run_load 在事件循环中复用同一浏览器登录"""
+        if not self._can_login():
+            return None
+        if self._needs_login():
+            self.unauthorized = False
+            if not await self.login_async(browser):
+                return None
+        return self._current()
+
+    async def login_async(self, browser: AsyncBrowser) -> bool:
+        from testAgent.async_actor import AsyncActor
+
+        context = await browser.new_context(viewport=BROWSER_CONFIG["viewport"])
+        try:
+            results = await AsyncActor(await context.new_page(), context).execute_plan(login_steps())
+            if not self._login_succeeded(results):
+                return False
+            self._save(await context.storage_state())
+            return True
+        finally:
+            await context.close()
+
+    def _can_login(self) -> bool:
+        if self.has_credentials:
+            return True
+        self.failure = "未配置 TEST_USERNAME/TEST_PASSWORD"
+        return False
+
+    def _needs_login(self) -> bool:
+        if SESSION_CONFIG["enabled"]:
+            return self.unauthorized or not self.is_valid()
+        return self.unauthorized or self._state is None
+
+    def _current(self) -> StorageState:
+        self.failure = ""
+        return str(self.path) if SESSION_CONFIG["enabled"] else self._state
+
+    def _login_succeeded(self, results: List[Dict[str, Any]]) -> bool:
+        """登录计划有失败步骤时删除旧的登录态、记录失败原因并返回 False"""
+        failed = next((r for r in results if r["status"] == "failed"), None)
+        if failed is None:
+            return True
+        self.invalidate()
+        self.failure = f"登录计划第 {failed.get('id')} 步失败（{failed.get('message', '')}）"
+        return False
+
+    def _save(self, state: Dict[str, Any]):
+        """禁用缓存时只保存在内存中，启用时原子写入磁盘"""
+        if SESSION_CONFIG["enabled"]:
+            write_text_atomic(self.path, json.dumps(state, ensure_ascii=False))
+        else:
+            self._state = state
+
+    def watch(self, context: BrowserContext):
+        """监听上下文的响应，出现 401 时标记登录态失效"""
+        def on_response(response: Response):
+            if response.status == 401:
+                self.unauthorized = True
+
+        context.on("response", on_response)
+
+    def invalidate(self):
+        """删除缓存的登录态"""
+        self.unauthorized = False
+        self._state = None
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,83 @@
+"""
+PhaseTimer - 步骤阶段计时，导出为 Chrome trace event（Perfetto 可直接打开）
+"""
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+PHASES = ("selector", "auto_wait", "action", "navigation", "screenshot", "backoff", "result")
+
+
+class PhaseTimer:
+    """
+    阶段计时器
+    - begin_step/end_step 记录整个步骤
+    - phase() 记录步骤内的各阶段：选择器解析、自动等待、动作、导航、截图、退避、结果组装
+    - 事件使用 trace event 格式的完整事件（ph = "X"），时间单位为微秒
+    """
+
+    def __init__(self, label: str = "plan"):
+        self.label = label
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._step: Optional[Dict[str, Any]] = None
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._origin) * 1_000_000
+
+    def begin_step(self, step: Dict[str, Any]):
+        self._step = {"id": step.get("id"), "action": step.get("action"), "start": self._now_us()}
+
+    def end_step(self, status: str = ""):
+        if not self._step:
+            return
+        self.events.append({
+            "name": f"step {self._step['id']} {self._step['action']}",
+            "cat": "step",
+            "ph": "X",
+            "ts": self._step["start"],
+            "dur": self._now_us() - self._step["start"],
+            "pid": 1,
+            "tid": 1,
+            "args": {"id": self._step["id"], "status": status},
+        })
+        self._step = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            self.events.append({
+                "name": name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": start,
+                "dur": self._now_us() - start,
+                "pid": 1,
+                "tid": 1,
+                "args": {"step": self._step["id"] if self._step else None},
+            })
+
+    def totals(self) -> Dict[str, float]:
+        """各阶段累计耗时（秒），用于报告摘要"""
+        totals = {name: 0.0 for name in PHASES}
+        for event in self.events:
+            if event["cat"] == "phase":
+                totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1_000_000
+        return {name: round(value, 3) for name, value in totals.items()}
+
+    def write(self, path: Path) -> str:
+        trace = {
+            "traceEvents": [
+                {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.label}},
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "Actor"}},
+                *self.events,
+            ],
+            "displayTimeUnit": "ms",
+        }
+        Path(path).write_text(json.dumps(trace, ensure_ascii=False), encoding="utf-8")
+        return str(path)
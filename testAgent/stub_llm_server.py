@@ -0,0 +1,70 @@
+"""
+本地 LLM 规划桩服务：按 HttpLLMBackend 的协议流式返回计划，用于离线测试与压测规划链路
+
+    python -m testAgent.stub_llm_server --port 8765 --delay 0.05
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from testAgent.planner import load_rules
+from testAgent.planner_backends import KeywordBackend
+
+
+class StubPlannerHandler(BaseHTTPRequestHandler):
+    """用关键词后端生成计划，逐个步骤以 NDJSON 分块返回，每步之间等待 delay 秒模拟生成耗时"""
+
+    protocol_version = "HTTP/1.1"  # 支持长连接，便于验证连接池复用
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        plan = self.server.backend.plan(request.get("instruction", ""))
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        meta = {"requires_auth": plan["requires_auth"], "routing_profile": plan["routing_profile"]}
+        self._write_chunk({"meta": meta})
+        for step in plan["steps"]:
+            time.sleep(self.server.delay)
+            self._write_chunk(step)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, obj):
+        data = (json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port: int = 0, delay: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """在后台线程启动桩服务，port 为 0 时自动分配；返回 (server, 规划地址)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubPlannerHandler)
+    server.daemon_threads = True
+    server.backend = KeywordBackend(load_rules())
+    server.delay = delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/plan"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 LLM 规划桩服务")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="每个步骤之间的等待秒数")
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.delay)
+    print(f"规划桩服务已启动: {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
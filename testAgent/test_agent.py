@@ -1,17 +1,69 @@
 """
 测试智能体主类
 """
-from typing import List, Dict, Any, Optional
+import asyncio
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
-from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
-from testAgent.config import BROWSER_CONFIG, TARGET_URL, REPORTS_DIR
+from playwright.sync_api import Browser, BrowserContext, Page
+from playwright.async_api import async_playwright, Browser as AsyncBrowser
+from testAgent.config import (
+    BROWSER_CONFIG,
+    TARGET_URL,
+    REPORTS_DIR,
+    TEST_CONFIG,
+    SELECTOR_CACHE_CONFIG,
+    PREFLIGHT_CONFIG,
+    PLAN_CACHE_CONFIG,
+    OPTIMIZER_CONFIG,
+)
+from testAgent.browser_pool import BrowserPool
+from testAgent.session_cache import SessionCache, SessionUnavailableError, StorageState
+from testAgent.routing import RequestRouter
+from testAgent.har_store import HarStore
+from testAgent.selector_cache import SelectorCache
+from testAgent.screenshot_service import get_screenshot_service
+from testAgent.tracing import AsyncFailureTracer, FailureTracer
+from testAgent.web_metrics import install_observers, install_observers_async
 from testAgent.scenarios.base_scenario import TestScenario
 from testAgent.scenarios import HomepageScenario, NavigationScenario
 from testAgent.planner import Planner, Plan
-from testAgent.actor import Actor
+from testAgent.plan_cache import PlanCache
+from testAgent.actor import Actor, build_result, navigate
+from testAgent.prefix_trie import PrefixNode, build_prefix_trie
+from testAgent.plan_validator import PlanValidator
+from testAgent.plan_optimizer import PlanOptimizer
+from testAgent.async_actor import AsyncActor
 from testAgent.reporter import Reporter
 
 
+def _run_shard(jobs: List[Union[Plan, TestScenario]]) -> Dict[str, Any]:
+    """子进程入口：用独立的 TestAgent（及其 Chromium）按顺序执行一个分片"""
+    agent = TestAgent()
+    try:
+        for job in jobs:
+            start = datetime.now()
+            try:
+                if isinstance(job, Plan):
+                    # run_plan 自行管理浏览器，先释放场景占用的页面
+                    agent.close_browser()
+                    agent.last_plan = job
+                    agent.run_plan()
+                else:
+                    agent.run_scenario(job)
+            except Exception as e:
+                # 单个任务的异常（如缺少 HAR、上下文创建失败）记为失败结果，分片继续执行
+                agent.close_browser()
+                agent.results.append(agent._failed_job(job, start, e))
+    finally:
+        agent.shutdown()
+    return agent.reporter.build_summary(agent.results)
+
+
 class TestAgent:
     """测试智能体 - 负责执行测试场景并生成报告"""
     
@@ -21,10 +73,15 @@ class TestAgent:
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.playwright = None
+        self.router: Optional[RequestRouter] = None
+        self.tracer: Optional[FailureTracer] = None
+        self.browser_pool = BrowserPool()
+        self.session_cache = SessionCache()
+        self.har_store = HarStore()
+        self.selector_cache = SelectorCache() if SELECTOR_CACHE_CONFIG["enabled"] else None
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
-        self.planner = Planner()
+        self.planner = Planner(cache=PlanCache() if PLAN_CACHE_CONFIG["enabled"] else None)
         self.reporter = Reporter()
         self.last_plan: Optional[Plan] = None
         
@@ -32,28 +89,67 @@ class TestAgent:
         """注册测试场景"""
         self.scenarios.append(scenario)
     
-    def initialize_browser(self):
-        """初始化浏览器"""
-        self.playwright = sync_playwright().start()
-        self.browser = self.playwright.chromium.launch(
-            headless=BROWSER_CONFIG["headless"],
-            slow_mo=BROWSER_CONFIG["slow_mo"]
-        )
+    def initialize_browser(
+        self,
+        authenticated: bool = False,
+        routing_profile: str = "",
+        har_key: str = "",
+        trace: bool = False,
+    ):
+        """
+        从浏览器池借出浏览器，并为本次执行创建独立的上下文
+        authenticated 为 True 时，上下文从缓存的登录态开始；
+        routing_profile 指定请求路由配置，为空时使用 TEST_CONFIG["routing_profile"]；
+        har_key 标识录制/回放使用的 HAR（通常为计划指令）；
+        trace 为 True 时启动失败追踪，只有按步骤回报结果的 Actor 路径才会导出 trace
+        """
+        self.browser = self.browser_pool.acquire()
+        # 回放模式必须离线，登录态已包含在录制的响应中，不再触发 UI 登录
+        use_session = authenticated and not self.har_store.offline
+        storage_state = self.session_cache.get(self.browser) if use_session else None
+        if use_session and not storage_state:
+            self.browser_pool.release(self.browser)
+            self.browser = None
+            raise SessionUnavailableError(self.session_cache.failure)
         self.context = self.browser.new_context(
-            viewport=BROWSER_CONFIG["viewport"]
+            viewport=BROWSER_CONFIG["viewport"],
+            storage_state=storage_state,
         )
+        if storage_state:
+            self.session_cache.watch(self.context)
+        # HAR 路由先安装，请求路由后安装并优先处理，未拦截的请求再回落到 HAR
+        self.har_store.apply(self.context, har_key)
+        self.router = RequestRouter(routing_profile)
+        self.router.apply(self.context)
+        if TEST_CONFIG["collect_web_metrics"]:
+            install_observers(self.context)
+        if trace and TEST_CONFIG["trace_on_failure"]:
+            self.tracer = FailureTracer(self.context)
+            self.tracer.start()
         self.page = self.context.new_page()
     
     def close_browser(self):
-        """关闭浏览器"""
+        """关闭上下文，并将浏览器归还到池中"""
+        if self.tracer:
+            self.tracer.stop()
+            self.tracer = None
         if self.page:
             self.page.close()
         if self.context:
             self.context.close()
         if self.browser:
-            self.browser.close()
-        if self.playwright:
-            self.playwright.stop()
+            self.browser_pool.release(self.browser)
+        self.page = None
+        self.context = None
+        self.browser = None
+        # 报告会引用截图文件，结束执行前确保后台写盘完成
+        get_screenshot_service().flush()
+
+    def shutdown(self):
+        """关闭浏览器池中的所有浏览器，并等待截图写盘完成"""
+        self.close_browser()
+        self.browser_pool.close_all()
+        get_screenshot_service().shutdown()
 
     def create_plan(self, instruction: str) -> Dict[str, Any]:
         """Planner: 从自然语言生成结构化计划"""
@@ -66,24 +162,56 @@ class TestAgent:
         返回 summary，包含可直接用于报告生成的结构
         """
         plan = self.last_plan
-        if instruction:
+        # 与最近一次 create_plan 的指令相同时直接复用，不再重新规划
+        if instruction and not (plan and plan.instruction == instruction):
             plan = self.planner.create_plan(instruction)
             self.last_plan = plan
         if not plan:
             raise ValueError("请先通过 create_plan 生成计划或传入指令")
 
         self.start_time = datetime.now()
+        rejected = self._preflight(plan)
+        if rejected:
+            self.end_time = datetime.now()
+            self.results.append(rejected)
+            return {
+                "plan": plan.to_dict(),
+                "summary": self.reporter.build_summary([rejected]),
+                "scenario": rejected,
+            }
+        steps, optimization = self._optimize(plan)
         try:
-            self.initialize_browser()
-            actor = Actor(self.page, self.context)
-            step_results = actor.execute_plan(plan.to_dict()["steps"])
+            self.initialize_browser(
+                authenticated=plan.requires_auth,
+                routing_profile=plan.routing_profile,
+                har_key=plan.instruction,
+                trace=True,
+            )
+            actor = Actor(
+                self.page,
+                self.context,
+                selector_cache=self.selector_cache,
+                tracer=self.tracer,
+                offline=self.har_store.offline,
+            )
+            step_results = actor.execute_plan(steps)
         finally:
+            routing = self.router.stats() if self.router else None
             self.close_browser()
             self.end_time = datetime.now()
 
         scenario = self.reporter.build_scenario_result(
             plan.to_dict(), step_results, self.start_time, self.end_time
         )
+        scenario["routing"] = routing
+        scenario["har_mode"] = self.har_store.mode
+        scenario["selector_cache"] = actor.selector_stats
+        scenario["optimization"] = optimization
+        if actor.timer:
+            # 与 HTML 报告放在同一目录，可在 chrome://tracing 或 Perfetto 中打开
+            timestamp = self.start_time.strftime("%Y%m%d_%H%M%S")
+            scenario["timing_trace"] = actor.timer.write(REPORTS_DIR / f"timing_{timestamp}.json")
+            scenario["phase_totals"] = actor.timer.totals()
         self.results.append(scenario)
         summary = self.reporter.build_summary([scenario])
         return {
@@ -92,16 +220,475 @@ class TestAgent:
             "scenario": scenario,
         }
     
+    def _resolve_plans(self, plans: List[Union[Plan, str]]) -> List[Plan]:
+        """将指令批量规划为计划（并发请求规划后端），已是 Plan 的保持不变"""
+        instructions = [p for p in plans if isinstance(p, str)]
+        planned = iter(self.planner.create_plans(instructions)) if instructions else iter(())
+        return [next(planned) if isinstance(p, str) else p for p in plans]
+
+    @staticmethod
+    def _optimize(plan: Plan) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """返回实际执行的步骤与优化记录（未启用优化时为 None）"""
+        steps = plan.to_dict()["steps"]
+        if not OPTIMIZER_CONFIG["enabled"]:
+            return steps, None
+        result = PlanOptimizer().optimize(steps)
+        return result.pop("steps"), result
+
+    def _error_scenario(self, plan: Plan, start: datetime, error: Exception) -> Dict[str, Any]:
+        """计划执行过程中抛出异常时的失败场景结果"""
+        scenario = self.reporter.build_scenario_result(plan.to_dict(), [], start, datetime.now())
+        scenario["status"] = "failed"
+        scenario["error_message"] = str(error)
+        return scenario
+
+    def _failed_job(self, job: Union[Plan, TestScenario], start: datetime, error: Exception) -> Dict[str, Any]:
+        """分片任务抛出异常时的失败结果，计划与场景分别沿用各自的结果结构"""
+        if isinstance(job, Plan):
+            return self._error_scenario(job, start, error)
+        job.status = "failed"
+        job.error_message = str(error)
+        return job.to_dict()
+
+    def _preflight(self, plan: Plan) -> Optional[Dict[str, Any]]:
+        """
+        启动浏览器前预检计划；存在错误时直接返回失败的场景结果，
+        出错步骤标记为 failed，其余步骤标记为 blocked
+        """
+        if not PREFLIGHT_CONFIG["enabled"]:
+            return None
+        start = datetime.now()
+        validator = PlanValidator(check_urls=PREFLIGHT_CONFIG["check_urls"] and not self.har_store.offline)
+        issues = [issue for issue in validator.validate(plan.to_dict()) if issue.level == "error"]
+        if not issues:
+            return None
+
+        messages: Dict[Any, List[str]] = {}
+        for issue in issues:
+            messages.setdefault(issue.step_id, []).append(issue.message)
+        step_results = []
+        for step in plan.to_dict()["steps"]:
+            if step["id"] in messages:
+                result = build_result(step, "failed", "预检失败: " + "；".join(messages[step["id"]]), "", 0.0)
+            else:
+                result = build_result(step, "blocked", "计划预检未通过，未执行", "", 0.0)
+            result["attempts"] = 0
+            step_results.append(result)
+        scenario = self.reporter.build_scenario_result(plan.to_dict(), step_results, start, datetime.now())
+        scenario["validation"] = [issue.to_dict() for issue in issues]
+        return scenario
+
+    async def run_plans(
+        self,
+        plans: List[Union[Plan, str]],
+        max_pages: Optional[int] = None,
+        on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        在同一个事件循环中并发执行多个计划
+        每个计划使用独立的 BrowserContext，信号量限制同时打开的页面数；
+        on_result(index, scenario) 在每个计划完成时立即回调，便于流式输出结果。
+        同一线程中用过同步 Playwright（浏览器池未关闭）后，该线程已注册运行中的事件循环，
+        不能再在其中 asyncio.run 本方法，需在新线程中运行或先调用 browser_pool.close_all()
+        """
+        plan_objs = self._resolve_plans(plans)
+        if not plan_objs:
+            raise ValueError("没有需要执行的计划")
+        semaphore = asyncio.Semaphore(max_pages or TEST_CONFIG["async_max_pages"])
+
+        self.start_time = datetime.now()
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=BROWSER_CONFIG["headless"],
+                slow_mo=BROWSER_CONFIG["slow_mo"]
+            )
+
+            storage_state = await self._async_session(browser, plan_objs)
+
+            async def execute(plan: Plan) -> Dict[str, Any]:
+                # 预检中的 HEAD 请求是阻塞调用，放到线程中执行，各计划的预检可以并行
+                rejected = await asyncio.to_thread(self._preflight, plan)
+                if rejected:
+                    return rejected
+                async with semaphore:
+                    start = datetime.now()
+                    router = RequestRouter(plan.routing_profile)
+                    try:
+                        steps, optimization = self._optimize(plan)
+                        step_results = await self._run_plan_async(
+                            browser, plan, steps, router, storage_state, trace=True
+                        )
+                    except Exception as e:
+                        # 单个计划的异常（如缺少 HAR）不影响同批其他计划
+                        return self._error_scenario(plan, start, e)
+                    scenario = self.reporter.build_scenario_result(
+                        plan.to_dict(), step_results, start, datetime.now()
+                    )
+                    scenario["routing"] = router.stats()
+                    scenario["optimization"] = optimization
+                    return scenario
+
+            async def run_one(index: int, plan: Plan) -> Dict[str, Any]:
+                scenario = await execute(plan)
+                if on_result:
+                    on_result(index, scenario)
+                return scenario
+
+            try:
+                # gather 按传入顺序返回结果，报告顺序与计划顺序一致
+                scenarios = await asyncio.gather(*(run_one(i, plan) for i, plan in enumerate(plan_objs)))
+            finally:
+                await browser.close()
+        get_screenshot_service().flush()
+        self.end_time = datetime.now()
+
+        self.results.extend(scenarios)
+        return {
+            "plans": [plan.to_dict() for plan in plan_objs],
+            "summary": self.reporter.build_summary(list(scenarios)),
+        }
+
+    async def _run_plan_async(
+        self,
+        browser: AsyncBrowser,
+        plan: Plan,
+        steps: List[Dict[str, Any]],
+        router: Optional[RequestRouter] = None,
+        storage_state: Optional[StorageState] = None,
+        trace: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        在新的 BrowserContext 中用 AsyncActor 执行计划的步骤。
+        storage_state 为批量执行前由 _async_session 建立的登录态，需要登录的计划缺少它时直接失败；
+        trace 为 True 时启动失败追踪（压测的每次迭代不追踪）
+        """
+        tracer: Optional[AsyncFailureTracer] = None
+        use_session = plan.requires_auth and not self.har_store.offline
+        if use_session and not storage_state:
+            raise SessionUnavailableError(self.session_cache.failure)
+        context = await browser.new_context(
+            viewport=BROWSER_CONFIG["viewport"],
+            storage_state=storage_state if use_session else None,
+        )
+        try:
+            if use_session:
+                self.session_cache.watch(context)
+            await self.har_store.apply_async(context, plan.instruction)
+            await (router or RequestRouter(plan.routing_profile)).apply_async(context)
+            if TEST_CONFIG["collect_web_metrics"]:
+                await install_observers_async(context)
+            if trace and TEST_CONFIG["trace_on_failure"]:
+                tracer = AsyncFailureTracer(context)
+                await tracer.start()
+            actor = AsyncActor(
+                await context.new_page(),
+                context,
+                offline=self.har_store.offline,
+                selector_cache=self.selector_cache,
+                tracer=tracer,
+            )
+            return await actor.execute_plan(steps)
+        finally:
+            if tracer:
+                await tracer.stop()
+            await context.close()
+
+    async def _async_session(self, browser: AsyncBrowser, plans: List[Plan]) -> Optional[StorageState]:
+        """
+        批量执行前只建立一次登录态（缓存无效时在同一浏览器中登录），供所有需要登录的计划共用；
+        回放模式或没有需要登录的计划时返回 None
+        """
+        if self.har_store.offline or not any(plan.requires_auth for plan in plans):
+            return None
+        return await self.session_cache.get_async(browser)
+
+    async def run_load(
+        self,
+        plan: Union[Plan, str],
+        iterations: int,
+        concurrency: int,
+        ramp_up: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        压测模式：同一计划执行 iterations 次，最多 concurrency 个上下文同时运行。
+        ramp_up 秒内逐个启动并发槽位；结果汇总为每步分位数、吞吐量与错误率，
+        不为每次迭代生成单独的场景条目。
+        与 run_plans 相同，不能在用过同步 Playwright 的线程中 asyncio.run 本方法
+        """
+        plan_obj = self.planner.create_plan(plan) if isinstance(plan, str) else plan
+        if iterations < 1 or concurrency < 1:
+            raise ValueError("迭代次数与并发数必须为正整数")
+        concurrency = min(concurrency, iterations)
+        rejected = self._preflight(plan_obj)
+        if rejected:
+            raise ValueError(f"计划预检未通过: {rejected['error_message']}")
+        steps, optimization = self._optimize(plan_obj)
+        remaining = iter(range(iterations))
+        runs: List[Dict[str, Any]] = []
+
+        self.start_time = datetime.now()
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=BROWSER_CONFIG["headless"],
+                slow_mo=BROWSER_CONFIG["slow_mo"]
+            )
+
+            async def slot(index: int):
+                if ramp_up:
+                    await asyncio.sleep(ramp_up * index / concurrency)
+                # 各槽位从同一个迭代器取任务，单线程事件循环下无需加锁
+                for _ in remaining:
+                    start = time.monotonic()
+                    try:
+                        step_results = await self._run_plan_async(browser, plan_obj, steps, None, storage_state)
+                    except Exception as e:
+                        # 单次迭代的异常记为出错的迭代，其余迭代继续执行
+                        runs.append({"duration": time.monotonic() - start, "steps": [], "error": f"异常: {e}"})
+                        continue
+                    runs.append({"duration": time.monotonic() - start, "steps": step_results})
+
+            try:
+                storage_state = await self._async_session(browser, [plan_obj])
+                if plan_obj.requires_auth and not self.har_store.offline and not storage_state:
+                    raise SessionUnavailableError(self.session_cache.failure)
+                await asyncio.gather(*(slot(i) for i in range(concurrency)))
+            finally:
+                await browser.close()
+        get_screenshot_service().flush()
+        self.end_time = datetime.now()
+
+        # 分位数按实际执行的步骤统计，被优化掉的步骤记录在 optimization 中
+        load = self.reporter.build_load_result(
+            dict(plan_obj.to_dict(), steps=steps), runs, self.start_time, self.end_time, concurrency, ramp_up
+        )
+        load["optimization"] = optimization
+        return {
+            "plan": plan_obj.to_dict(),
+            "load": load,
+            "report": self.reporter.generator.generate_load_report(load),
+        }
+
+    def run_plans_shared(self, plans: List[Union[Plan, str]]) -> Dict[str, Any]:
+        """
+        共享前缀执行一批计划：
+        按步骤构建前缀树，公共前缀（如登录、打开首页）只执行一次，
+        在分叉处保存 storage state 与当前 URL，为每个分支创建新的上下文继续执行。
+        登录态或路由配置不同的计划无法共享上下文，分组处理；HAR 录制/回放按计划区分，不做共享。
+        """
+        plan_objs = self._resolve_plans(plans)
+        if not plan_objs:
+            raise ValueError("没有需要执行的计划")
+        if self.har_store.mode != "live":
+            scenarios = []
+            for plan in plan_objs:
+                self.last_plan = plan
+                scenarios.append(self.run_plan()["scenario"])
+            return {
+                "plans": [plan.to_dict() for plan in plan_objs],
+                "summary": self.reporter.build_summary(scenarios),
+            }
+
+        self.start_time = datetime.now()
+        scenarios: List[Optional[Dict[str, Any]]] = [None] * len(plan_objs)
+        groups: Dict[Tuple[bool, str], Dict[int, List[Dict[str, Any]]]] = {}
+        optimizations: Dict[int, Optional[Dict[str, Any]]] = {}
+        for index, plan in enumerate(plan_objs):
+            rejected = self._preflight(plan)
+            if rejected:
+                scenarios[index] = rejected
+                continue
+            steps, optimizations[index] = self._optimize(plan)
+            if not steps:
+                # 没有步骤的计划不进入前缀树，否则不会产生结果
+                scenarios[index] = self._error_scenario(plan, datetime.now(), ValueError("计划没有可执行的步骤"))
+                continue
+            groups.setdefault((plan.requires_auth, plan.routing_profile), {})[index] = steps
+
+        finished: Dict[int, Tuple[List[Dict[str, Any]], datetime, str]] = {}
+        planned_steps = executed_steps = 0
+        browser = self.browser_pool.acquire()
+        try:
+            for (requires_auth, routing_profile), step_lists in groups.items():
+                storage_state = self.session_cache.get(browser) if requires_auth else None
+                if requires_auth and not storage_state:
+                    error = SessionUnavailableError(self.session_cache.failure)
+                    for index in step_lists:
+                        scenarios[index] = self._error_scenario(plan_objs[index], self.start_time, error)
+                    continue
+                root = build_prefix_trie(step_lists)
+                planned_steps += sum(len(steps) for steps in step_lists.values())
+                executed_steps += root.count()
+                for child in root.children.values():
+                    self._run_prefix_branch(
+                        browser, child, (storage_state, "", ""), [], {}, routing_profile, finished,
+                        TEST_CONFIG["retry_budget"],
+                    )
+        finally:
+            self.browser_pool.release(browser)
+            get_screenshot_service().flush()
+        self.end_time = datetime.now()
+
+        for index, (results, end, error) in finished.items():
+            plan_steps = groups[(plan_objs[index].requires_auth, plan_objs[index].routing_profile)][index]
+            # 共享步骤的结果按各计划自己的步骤说明展示
+            results = [
+                dict(result, name=step.get("note") or step.get("action"), expected=step.get("expect", ""))
+                for result, step in zip(results, plan_steps)
+            ]
+            scenario = self.reporter.build_scenario_result(
+                plan_objs[index].to_dict(), results, self.start_time, end
+            )
+            if error:
+                scenario["status"] = "failed"
+                scenario["error_message"] = error
+            scenario["optimization"] = optimizations[index]
+            scenarios[index] = scenario
+        self.results.extend(scenarios)
+        return {
+            "plans": [plan.to_dict() for plan in plan_objs],
+            "summary": self.reporter.build_summary(list(scenarios)),
+            "shared": {"planned_steps": planned_steps, "executed_steps": executed_steps},
+        }
+
+    def _run_prefix_branch(
+        self,
+        browser: Browser,
+        node: PrefixNode,
+        fork: Tuple[Optional[Dict[str, Any]], str, str],
+        prior: List[Dict[str, Any]],
+        variables: Dict[str, Any],
+        routing_profile: str,
+        finished: Dict[int, Tuple[List[Dict[str, Any]], datetime, str]],
+        retry_budget: int,
+    ):
+        """
+        在新上下文中从 fork=(storage_state, url, wait_until) 恢复状态，沿前缀树执行一个分支。
+        retry_budget 为分叉前剩余的重试次数，每个分支从该值继续扣减，
+        经过的每个计划合计的重试次数与单独执行时相同。
+        无分叉的连续步骤一次交给 Actor，以保留步骤合并等优化；
+        分叉时除最后一个分支外都递归到新上下文，最后一个分支沿用当前上下文。
+        分叉只发生在导航稳定点（见 prefix_trie.stable_segments）。
+        分支内的异常（创建上下文、恢复导航失败等）只让经过该分支且尚未完成的计划失败，
+        已完成的结果与其他分支不受影响
+        """
+        members = node.members
+        results = list(prior)
+        context = None
+        try:
+            storage_state, url, wait_until = fork
+            context = browser.new_context(viewport=BROWSER_CONFIG["viewport"], storage_state=storage_state)
+            RequestRouter(routing_profile).apply(context)
+            if TEST_CONFIG["collect_web_metrics"]:
+                install_observers(context)
+            page = context.new_page()
+            if url:
+                navigate(page, url, wait_until)
+            actor = Actor(page, context, selector_cache=self.selector_cache)
+            actor.variables = dict(variables)
+            actor.retry_budget = retry_budget
+            while True:
+                segment = [node]
+                while len(node.children) == 1 and not node.plans:
+                    node = next(iter(node.children.values()))
+                    segment.append(node)
+                results.extend(actor.execute_plan([n.step for n in segment], prior=results))
+                wait_until = next(
+                    (n.step.get("wait_until", "") for n in reversed(segment) if n.step.get("action") == "goto"),
+                    wait_until,
+                )
+                for plan_index in node.plans:
+                    finished[plan_index] = (list(results), datetime.now(), "")
+                branches = list(node.children.values())
+                if not branches:
+                    break
+                if len(branches) > 1:
+                    state = (context.storage_state(), page.url, wait_until)
+                    for branch in branches[:-1]:
+                        self._run_prefix_branch(
+                            browser, branch, state, results, actor.variables, routing_profile, finished,
+                            actor.retry_budget,
+                        )
+                node = branches[-1]
+        except Exception as e:
+            for plan_index in members:
+                if plan_index not in finished:
+                    finished[plan_index] = (list(results), datetime.now(), f"共享前缀分支执行异常: {e}")
+        finally:
+            if context:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+
+    def run_sharded(
+        self,
+        plans: List[Union[Plan, str]],
+        scenarios: Optional[List[TestScenario]] = None,
+        processes: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        多进程分片执行计划与场景，每个进程启动自己的 Chromium。
+        各进程返回 Reporter.build_summary 的结果，由父进程合并成一份摘要和一份报告。
+        """
+        jobs: List[Union[Plan, TestScenario]] = list(self._resolve_plans(plans))
+        jobs.extend(scenarios or [])
+        if not jobs:
+            raise ValueError("没有需要执行的计划或场景")
+
+        processes = max(1, min(processes or TEST_CONFIG["shard_processes"], len(jobs)))
+        # 连续切片分配，合并时按分片顺序拼接即可保持原始顺序
+        shards = self._split(jobs, processes)
+
+        self.start_time = datetime.now()
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=ctx) as executor:
+            futures = [executor.submit(_run_shard, shard) for shard in shards]
+            summaries = []
+            for shard, future in zip(shards, futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as e:
+                    # 子进程自身崩溃（如无法启动 Chromium）时，该分片的任务全部记为失败
+                    summaries.append(self.reporter.build_summary(
+                        [self._failed_job(job, self.start_time, e) for job in shard]
+                    ))
+        self.end_time = datetime.now()
+
+        summary = self.reporter.merge_summaries(summaries)
+        self.results.extend(summary["scenarios"])
+        return {
+            "summary": summary,
+            "reports": self.reporter.generate_reports(summary),
+        }
+
+    @staticmethod
+    def _split(items: List[Any], parts: int) -> List[List[Any]]:
+        """将列表尽量均匀地切成 parts 个连续片段"""
+        size, extra = divmod(len(items), parts)
+        shards: List[List[Any]] = []
+        start = 0
+        for i in range(parts):
+            end = start + size + (1 if i < extra else 0)
+            shards.append(items[start:end])
+            start = end
+        return shards
+    
     def run_scenario(self, scenario: TestScenario) -> bool:
         """运行单个测试场景"""
         if not self.page:
             self.initialize_browser()
         
+        result = self._execute_scenario(scenario, self.page, self.context)
+        self.results.append(scenario.to_dict())
+        return result
+
+    def _execute_scenario(self, scenario: TestScenario, page: Page, context: BrowserContext) -> bool:
+        """在给定页面上执行场景，并记录状态与起止时间"""
         scenario.start_time = datetime.now()
         scenario.status = "running"
         
         try:
-            result = scenario.execute(self.page, self.context)
+            result = scenario.execute(page, context)
             scenario.status = "passed" if result else "failed"
         except Exception as e:
             scenario.status = "failed"
@@ -109,13 +696,65 @@ class TestAgent:
             result = False
         finally:
             scenario.end_time = datetime.now()
-        
-        self.results.append(scenario.to_dict())
         return result
+
+    def _run_scenarios_concurrently(self, workers: int) -> List[bool]:
+        """
+        多线程并发执行场景。
+        Playwright 同步 API 绑定线程，因此每个工作线程持有自己的浏览器池，
+        每个场景使用独立的 BrowserContext/Page。返回值与 self.scenarios 顺序一致。
+        """
+        outcomes: List[bool] = [False] * len(self.scenarios)
+        pending: "queue.Queue[int]" = queue.Queue()
+        for index in range(len(self.scenarios)):
+            pending.put(index)
+
+        def run_isolated(pool: BrowserPool, scenario: TestScenario) -> bool:
+            browser = pool.acquire()
+            try:
+                context = browser.new_context(viewport=BROWSER_CONFIG["viewport"])
+                try:
+                    RequestRouter().apply(context)
+                    if TEST_CONFIG["collect_web_metrics"]:
+                        install_observers(context)
+                    return self._execute_scenario(scenario, context.new_page(), context)
+                finally:
+                    context.close()
+            finally:
+                pool.release(browser)
+
+        def worker():
+            pool = BrowserPool(max_size=1)
+            try:
+                while True:
+                    try:
+                        index = pending.get_nowait()
+                    except queue.Empty:
+                        break
+                    scenario = self.scenarios[index]
+                    try:
+                        outcomes[index] = run_isolated(pool, scenario)
+                    except Exception as e:
+                        scenario.status = "failed"
+                        scenario.error_message = str(e)
+            finally:
+                pool.close_all()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(workers, len(self.scenarios)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        get_screenshot_service().flush()
+        return outcomes
     
-    def run_all_scenarios(self) -> Dict[str, Any]:
-        """运行所有注册的测试场景"""
+    def run_all_scenarios(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        运行所有注册的测试场景
+        workers 大于 1 时并发执行，默认读取 TEST_CONFIG["scenario_workers"]
+        """
         self.start_time = datetime.now()
+        workers = workers or TEST_CONFIG["scenario_workers"]
         
         if not self.scenarios:
             return {
@@ -123,15 +762,19 @@ class TestAgent:
                 "message": "没有注册的测试场景"
             }
         
-        try:
-            self.initialize_browser()
-            
-            passed = 0
-            failed = 0
-            
-            for scenario in self.scenarios:
-                print(f"\n正在执行: {scenario.name}")
-                result = self.run_scenario(scenario)
+        passed = 0
+        failed = 0
+
+        if workers > 1:
+            print(f"\n并发执行 {len(self.scenarios)} 个场景（{workers} 个工作线程）")
+            try:
+                outcomes = self._run_scenarios_concurrently(workers)
+            finally:
+                self.end_time = datetime.now()
+
+            # 按注册顺序收集结果，保证报告顺序稳定
+            for scenario, result in zip(self.scenarios, outcomes):
+                self.results.append(scenario.to_dict())
                 if result:
                     passed += 1
                     print(f"✓ {scenario.name} - 通过")
@@ -140,10 +783,25 @@ class TestAgent:
                     print(f"✗ {scenario.name} - 失败")
                     if scenario.error_message:
                         print(f"  错误: {scenario.error_message}")
-        
-        finally:
-            self.close_browser()
-            self.end_time = datetime.now()
+        else:
+            try:
+                self.initialize_browser()
+                
+                for scenario in self.scenarios:
+                    print(f"\n正在执行: {scenario.name}")
+                    result = self.run_scenario(scenario)
+                    if result:
+                        passed += 1
+                        print(f"✓ {scenario.name} - 通过")
+                    else:
+                        failed += 1
+                        print(f"✗ {scenario.name} - 失败")
+                        if scenario.error_message:
+                            print(f"  错误: {scenario.error_message}")
+            
+            finally:
+                self.close_browser()
+                self.end_time = datetime.now()
         
         summary = {
             "total": len(self.scenarios),
@@ -0,0 +1,133 @@
+"""
+FailureTracer - 仅在失败时落盘的 Playwright 追踪
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from playwright.sync_api import BrowserContext
+from testAgent.config import TEST_CONFIG, TRACES_DIR
+
+
+class FailureTracer:
+    """
+    失败追踪
+    - 整个上下文只启动一次 tracing，按步骤滚动 trace chunk
+    - 连续 window 个步骤通过后直接丢弃当前 chunk（不写文件），再开启新 chunk
+    - 步骤失败时只导出当前 chunk，刚换 chunk 后失败的步骤之前的上下文会少于 window 个步骤
+    - keep_previous 为 True 时，换 chunk 前把通过的 chunk 暂存为上一个 chunk（只保留一个），
+      失败时一并保留；每次换 chunk 都要写一次完整的 chunk，只在排查需要更长上下文时开启
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        window: Optional[int] = None,
+        directory: Optional[Path] = None,
+        keep_previous: Optional[bool] = None,
+    ):
+        self.context = context
+        self.window = window or TEST_CONFIG["trace_window"]
+        self.directory = Path(directory or TRACES_DIR)
+        self.keep_previous = TEST_CONFIG["trace_keep_previous"] if keep_previous is None else keep_previous
+        self._previous = self.directory / f".previous_chunk_{id(self)}.zip"
+        # 标记当前 chunk 不导出，结束 chunk 时不传 path
+        self._discard = Path()
+        self._steps_in_chunk = 0
+        self._active = False
+
+    def start(self):
+        self.context.tracing.start(screenshots=True, snapshots=True)
+        self._started()
+
+    def step_finished(self, result: Dict[str, Any]) -> List[str]:
+        """
+        步骤结束后调用；失败时返回导出的 trace 路径 [上一个 chunk（如有）, 当前 chunk]，
+        否则返回空列表
+        """
+        export = self._next_export(result)
+        if export is None:
+            return []
+        if export == self._discard:
+            self.context.tracing.stop_chunk()
+        else:
+            self.context.tracing.stop_chunk(path=str(export))
+        self.context.tracing.start_chunk()
+        return self._exported(export, result)
+
+    def stop(self):
+        """结束追踪并丢弃未导出的数据"""
+        if not self._active:
+            return
+        self._active = False
+        try:
+            self.context.tracing.stop()
+        except Exception:
+            pass
+        self._previous.unlink(missing_ok=True)
+
+    def _started(self):
+        self._active = True
+        self._steps_in_chunk = 0
+
+    def _next_export(self, result: Dict[str, Any]) -> Optional[Path]:
+        """
+        记录一个步骤结果，返回当前 chunk 需要导出到的路径：
+        失败时为 trace 文件；满 window 个步骤时为暂存的上一个 chunk（keep_previous）
+        或 _discard（直接丢弃）；否则为 None
+        """
+        if not self._active or result.get("status") == "blocked":
+            return None
+        if result.get("status") == "failed":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            export = self.directory / f"trace_step_{result.get('id', 'x')}_{timestamp}.zip"
+        else:
+            self._steps_in_chunk += 1
+            if self._steps_in_chunk < self.window:
+                return None
+            self._steps_in_chunk = 0
+            if not self.keep_previous:
+                return self._discard
+            # 覆盖暂存的上一个 chunk，更早的 chunk 不再需要
+            export = self._previous
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._steps_in_chunk = 0
+        return export
+
+    def _exported(self, export: Path, result: Dict[str, Any]) -> List[str]:
+        if result.get("status") != "failed":
+            return []
+        paths = [str(export)]
+        if self._previous.exists():
+            before = export.with_name(export.stem + "_before.zip")
+            self._previous.replace(before)
+            paths.insert(0, str(before))
+        return paths
+
+
+class AsyncFailureTracer(FailureTracer):
+    """FailureTracer 的异步 API 版本，供 AsyncActor 使用"""
+
+    async def start(self):
+        await self.context.tracing.start(screenshots=True, snapshots=True)
+        self._started()
+
+    async def step_finished(self, result: Dict[str, Any]) -> List[str]:
+        export = self._next_export(result)
+        if export is None:
+            return []
+        if export == self._discard:
+            await self.context.tracing.stop_chunk()
+        else:
+            await self.context.tracing.stop_chunk(path=str(export))
+        await self.context.tracing.start_chunk()
+        return self._exported(export, result)
+
+    async def stop(self):
+        if not self._active:
+            return
+        self._active = False
+        try:
+            await self.context.tracing.stop()
+        except Exception:
+            pass
+        self._previous.unlink(missing_ok=True)
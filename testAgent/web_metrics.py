@@ -0,0 +1,130 @@
+"""
+Web 性能指标采集：Navigation Timing、FCP、LCP、CLS、TBT 与传输体积
+"""
+from typing import Dict, Any, List, Optional
+from playwright.sync_api import BrowserContext, Page
+from playwright.async_api import BrowserContext as AsyncBrowserContext, Page as AsyncPage
+
+# 在文档创建前注册观察器，LCP / CLS / Long Task 只能通过 PerformanceObserver 获取
+_OBSERVER_JS = """(() => {
+    if (window.__testAgentMetrics) return;
+    const m = window.__testAgentMetrics = { lcp: null, cls: 0, longTasks: [] };
+    const observe = (type, cb) => {
+        try { new PerformanceObserver(list => list.getEntries().forEach(cb)).observe({ type, buffered: true }); } catch (e) {}
+    };
+    observe('largest-contentful-paint', e => { m.lcp = e.startTime; });
+    observe('layout-shift', e => { if (!e.hadRecentInput) m.cls += e.value; });
+    observe('longtask', e => { m.longTasks.push([e.startTime, e.duration]); });
+})();"""
+
+_COLLECT_JS = """() => {
+    const nav = performance.getEntriesByType('navigation')[0] || {};
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    const fcp = paint ? paint.startTime : null;
+    const m = window.__testAgentMetrics || { lcp: null, cls: 0, longTasks: [] };
+    // TBT：FCP 之后每个长任务超出 50ms 的部分之和
+    const tbt = m.longTasks
+        .filter(([start]) => fcp === null || start >= fcp)
+        .reduce((sum, [, duration]) => sum + Math.max(0, duration - 50), 0);
+    const resources = performance.getEntriesByType('resource');
+    const round = v => (v === null || v === undefined || v === 0) ? null : Math.round(v);
+    return {
+        ttfb: round(nav.responseStart),
+        dom_content_loaded: round(nav.domContentLoadedEventEnd),
+        load: round(nav.loadEventEnd),
+        fcp: round(fcp),
+        lcp: round(m.lcp),
+        cls: Math.round(m.cls * 1000) / 1000,
+        tbt: Math.round(tbt),
+        transfer_size: (nav.transferSize || 0) + resources.reduce((sum, r) => sum + (r.transferSize || 0), 0),
+        requests: resources.length + 1,
+    };
+}"""
+
+# LCP 在页面停止渲染更大元素后才稳定：等待 LCP 已产生且 quiet 毫秒内不再变化，最多等待 timeout 毫秒
+_LCP_SETTLE_JS = """async ([quiet, timeout]) => {
+    const m = window.__testAgentMetrics;
+    if (!m) return;
+    const deadline = performance.now() + timeout;
+    let last = m.lcp;
+    let stableSince = performance.now();
+    while (performance.now() < deadline) {
+        await new Promise(resolve => setTimeout(resolve, 100));
+        if (m.lcp !== last) {
+            last = m.lcp;
+            stableSince = performance.now();
+        } else if (m.lcp !== null && performance.now() - stableSince >= quiet) {
+            return;
+        }
+    }
+}"""
+LCP_QUIET_MS = 500
+LCP_SETTLE_TIMEOUT_MS = 5000
+
+# 指标单位：时间类为毫秒，cls 无单位，transfer_size 为字节
+METRIC_UNITS = {
+    "ttfb": "ms",
+    "dom_content_loaded": "ms",
+    "load": "ms",
+    "fcp": "ms",
+    "lcp": "ms",
+    "cls": "",
+    "tbt": "ms",
+    "transfer_size": "B",
+    "requests": "",
+}
+
+
+class BudgetExceededError(Exception):
+    """性能指标超出预算"""
+
+
+def install_observers(context: BrowserContext):
+    """为上下文中所有页面注入性能观察器，需在导航前调用"""
+    context.add_init_script(_OBSERVER_JS)
+
+
+def collect_metrics(page: Page) -> Dict[str, Any]:
+    """读取当前页面的性能指标；load 尚未触发时对应值为 None"""
+    return page.evaluate(_COLLECT_JS)
+
+
+def settle_metrics(page: Page):
+    """
+    判定预算前等待指标稳定：load 事件触发，且 LCP 不再变化。
+    goto 的就绪策略（commit / domcontentloaded / selector）通常早于这两者
+    """
+    page.wait_for_load_state("load")
+    page.evaluate(_LCP_SETTLE_JS, [LCP_QUIET_MS, LCP_SETTLE_TIMEOUT_MS])
+
+
+async def install_observers_async(context: AsyncBrowserContext):
+    await context.add_init_script(_OBSERVER_JS)
+
+
+async def collect_metrics_async(page: AsyncPage) -> Dict[str, Any]:
+    return await page.evaluate(_COLLECT_JS)
+
+
+async def settle_metrics_async(page: AsyncPage):
+    await page.wait_for_load_state("load")
+    await page.evaluate(_LCP_SETTLE_JS, [LCP_QUIET_MS, LCP_SETTLE_TIMEOUT_MS])
+
+
+def check_budgets(metrics: Dict[str, Any], budgets: Optional[Dict[str, float]]) -> List[str]:
+    """返回超出预算的描述列表；设定了预算却未采集到的指标同样视为不通过"""
+    violations: List[str] = []
+    for name, limit in (budgets or {}).items():
+        value = metrics.get(name)
+        if value is None:
+            violations.append(f"{name} 未采集到")
+        elif value > limit:
+            unit = METRIC_UNITS.get(name, "")
+            violations.append(f"{name} {value}{unit} > {limit}{unit}")
+    return violations
+
+
+def enforce_budgets(metrics: Dict[str, Any], budgets: Optional[Dict[str, float]]):
+    violations = check_budgets(metrics, budgets)
+    if violations:
+        raise BudgetExceededError("性能预算未通过: " + "；".join(violations))